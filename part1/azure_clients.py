@@ -0,0 +1,129 @@
+import os
+import logging
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
+from openai import AzureOpenAI
+
+import tracing
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+# Pool sizes should cover the batch concurrency (see batch_extract.py)
+AZURE_POOL_SIZE = int(os.getenv("AZURE_POOL_SIZE", "32"))
+AZURE_CONNECT_TIMEOUT = float(os.getenv("AZURE_CONNECT_TIMEOUT", "10"))
+AZURE_READ_TIMEOUT = float(os.getenv("AZURE_READ_TIMEOUT", "120"))
+AZURE_MAX_RETRIES = int(os.getenv("AZURE_MAX_RETRIES", "3"))
+# Structured outputs (json_schema response_format) need 2024-08-01-preview or later
+AOAI_API_VERSION = os.getenv("AOAI_API_VERSION", "2024-08-01-preview")
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _count_retry_requests(response, *args, **kwargs):
+    # Throttled / failed responses are what the SDK retry policies retry
+    if _is_retryable(response.status_code):
+        tracing.add(retries=1)
+
+
+def _count_retry_httpx(response):
+    if _is_retryable(response.status_code):
+        tracing.add(retries=1)
+
+
+def _get_or_create(key: tuple, factory):
+    """Return the process-lifetime client stored under `key`, creating it once."""
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+    return client
+
+
+def get_document_client(endpoint: str, key: str) -> DocumentAnalysisClient:
+    """
+    Shared DocumentAnalysisClient for `endpoint`, backed by a keep-alive
+    requests session whose connection pool is sized for batch concurrency.
+    """
+    def factory():
+        logger.info(
+            "Initializing shared Azure Form Recognizer client (pool=%d, retries=%d)",
+            AZURE_POOL_SIZE, AZURE_MAX_RETRIES
+        )
+        session = requests.Session()
+        # Retries are handled by the azure-core retry policy, not by urllib3
+        adapter = HTTPAdapter(
+            pool_connections=AZURE_POOL_SIZE,
+            pool_maxsize=AZURE_POOL_SIZE,
+            max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.hooks["response"].append(_count_retry_requests)
+
+        return DocumentAnalysisClient(
+            endpoint=endpoint,
+            credential=AzureKeyCredential(key),
+            transport=RequestsTransport(session=session, session_owner=True),
+            connection_timeout=AZURE_CONNECT_TIMEOUT,
+            read_timeout=AZURE_READ_TIMEOUT,
+            retry_total=AZURE_MAX_RETRIES
+        )
+
+    return _get_or_create(("document", endpoint, key), factory)
+
+
+def get_openai_client(endpoint: str, api_key: str, api_version: str = AOAI_API_VERSION) -> AzureOpenAI:
+    """Shared AzureOpenAI client for `endpoint`, backed by one pooled keep-alive httpx client."""
+    def factory():
+        logger.info(
+            "Initializing shared AzureOpenAI client (pool=%d, retries=%d)",
+            AZURE_POOL_SIZE, AZURE_MAX_RETRIES
+        )
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=AZURE_POOL_SIZE,
+                max_keepalive_connections=AZURE_POOL_SIZE,
+                keepalive_expiry=60
+            ),
+            timeout=httpx.Timeout(AZURE_READ_TIMEOUT, connect=AZURE_CONNECT_TIMEOUT),
+            event_hooks={"response": [_count_retry_httpx]}
+        )
+        return AzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            max_retries=AZURE_MAX_RETRIES,
+            http_client=http_client
+        )
+
+    return _get_or_create(("openai", endpoint, api_key, api_version), factory)
+
+
+def close_clients():
+    """Close every shared client (e.g. at the end of a batch run)."""
+    with _lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                logger.exception("Failed closing shared Azure client")
+        _clients.clear()
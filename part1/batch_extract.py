@@ -0,0 +1,302 @@
+"""
+Headless batch extraction for Part 1.
+
+Runs OCR -> LLM extraction -> validation -> translation over a directory or a
+manifest of files, with bounded concurrency and a rate limit per stage.
+Results are appended to a JSONL file as they finish; re-running with the same
+output file resumes from it and skips documents that already succeeded.
+With --split-forms, PDFs holding several stapled forms are split into one
+segment per form (form_segmenter.py) and each form gets its own record.
+
+Usage (from the project root):
+    python part1/batch_extract.py --input forms/ --output results.jsonl \\
+        --ocr-workers 4 --llm-workers 8 --ocr-rpm 15 --llm-rpm 60 --language hebrew
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from logging_config import setup_logging
+from text_layer import extract_text
+from form_segmenter import segment_document, segment_bytes, SEGMENT_WORKERS
+from llm_extractor import extract_fields_cascading
+from validation import validate_extraction
+from form_translator import translate_form
+from pipeline_cache import sha256_hex
+from azure_clients import close_clients
+from part1_config import (
+    DOC_INTEL_ENDPOINT, DOC_INTEL_KEY, AOAI_ENDPOINT, AOAI_KEY,
+    EXTRACTION_TIERS, CASCADE_MIN_COMPLETENESS, CASCADE_MAX_FORMAT_ERRORS
+)
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png")
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls evenly to at most `per_minute` per minute (0 = unlimited)."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Stage:
+    """Concurrency bound + rate limit for one pipeline stage."""
+
+    def __init__(self, name: str, workers: int, per_minute: float):
+        self.name = name
+        self._semaphore = threading.BoundedSemaphore(workers)
+        self._limiter = RateLimiter(per_minute)
+
+    def run(self, fn, *args):
+        with self._semaphore:
+            self._limiter.wait()
+            return fn(*args)
+
+
+def collect_inputs(input_path: str) -> list:
+    """List input files from a directory (recursive) or a manifest (one path per line, or JSONL with "path")."""
+    if os.path.isdir(input_path):
+        files = []
+        for root, _, names in os.walk(input_path):
+            for name in sorted(names):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+
+    base_dir = os.path.dirname(os.path.abspath(input_path))
+    files = []
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if line.startswith("{") else line
+            files.append(path if os.path.isabs(path) else os.path.join(base_dir, path))
+    return files
+
+
+def load_checkpoint(output_path: str) -> set:
+    """
+    SHA-256 hashes of documents already processed successfully in `output_path`,
+    plus "<sha256>#<form_index>" for the finished forms of split bundles.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed checkpoint line")
+                continue
+            if record.get("status") != "ok":
+                continue
+            if "form_index" not in record:
+                done.add(record.get("sha256"))
+                continue
+            # Bundles: a form is done on its own, the file once all its forms are
+            done.add(f"{record['sha256']}#{record['form_index']}")
+            form_keys = {f"{record['sha256']}#{index}" for index in range(1, record["forms"] + 1)}
+            if form_keys <= done:
+                done.add(record["sha256"])
+    return done
+
+
+def _extract_record(record: dict, ocr_text: str, stages: dict, language: str) -> dict:
+    """LLM extraction, validation and translation of one form's OCR text into `record`."""
+    start = time.perf_counter()
+    extracted = stages["llm"].run(
+        extract_fields_cascading, ocr_text, AOAI_ENDPOINT, AOAI_KEY,
+        EXTRACTION_TIERS, CASCADE_MIN_COMPLETENESS, CASCADE_MAX_FORMAT_ERRORS
+    )
+    record["timings"]["llm_s"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    validation = validate_extraction(extracted)
+    record["timings"]["validation_s"] = round(time.perf_counter() - start, 4)
+
+    start = time.perf_counter()
+    if language.lower() != "english":
+        extracted = translate_form(extracted, language)
+        validation = translate_form(validation, language)
+    record["timings"]["translation_s"] = round(time.perf_counter() - start, 4)
+
+    record["extracted"] = extracted
+    record["validation"] = validation
+    return record
+
+
+def process_document(path: str, file_bytes: bytes, file_hash: str, stages: dict, language: str) -> dict:
+    """Run the full pipeline on one document and return its result record."""
+    record = {"file": path, "sha256": file_hash, "status": "ok", "timings": {}}
+
+    start = time.perf_counter()
+    ocr_text = stages["ocr"].run(extract_text, file_bytes, DOC_INTEL_ENDPOINT, DOC_INTEL_KEY)
+    record["timings"]["ocr_s"] = round(time.perf_counter() - start, 3)
+
+    return _extract_record(record, ocr_text, stages, language)
+
+
+def process_bundle(path: str, file_bytes: bytes, file_hash: str, stages: dict, language: str,
+                   done: set = frozenset()) -> list:
+    """
+    Split a PDF holding several stapled forms into one segment per form and run the
+    pipeline on the segments concurrently (bounded by the stages). Returns one record
+    per form, with its 1-based form_index and page range; forms whose
+    "<sha256>#<form_index>" is in `done` are skipped.
+    """
+    start = time.perf_counter()
+    segments = stages["ocr"].run(segment_document, file_bytes, DOC_INTEL_ENDPOINT, DOC_INTEL_KEY)
+    segment_s = round(time.perf_counter() - start, 3)
+    page_count = segments[-1].end
+
+    def run_segment(index: int, segment) -> dict:
+        record = {
+            "file": path, "sha256": file_hash, "form_index": index, "forms": len(segments),
+            "pages": [segment.start + 1, segment.end], "status": "ok", "timings": {"segment_s": segment_s},
+        }
+        try:
+            ocr_text = segment.text
+            if ocr_text is None:
+                start = time.perf_counter()
+                ocr_text = stages["ocr"].run(
+                    extract_text, segment_bytes(file_bytes, segment, page_count),
+                    DOC_INTEL_ENDPOINT, DOC_INTEL_KEY
+                )
+                record["timings"]["ocr_s"] = round(time.perf_counter() - start, 3)
+            return _extract_record(record, ocr_text, stages, language)
+        except Exception as e:
+            logger.exception("Form processing failed (file=%s, form_index=%d)", path, index)
+            record.update(status="error", error=str(e))
+            return record
+
+    pending = [
+        (index, segment) for index, segment in enumerate(segments, start=1)
+        if f"{file_hash}#{index}" not in done
+    ]
+    if not pending:
+        return []
+    with ThreadPoolExecutor(max_workers=min(SEGMENT_WORKERS, len(pending))) as executor:
+        futures = [executor.submit(run_segment, index, segment) for index, segment in pending]
+        return [future.result() for future in futures]
+
+
+def run_batch(files: list, output_path: str, ocr_workers: int, llm_workers: int,
+              ocr_rpm: float, llm_rpm: float, language: str, split_forms: bool = False) -> dict:
+    stages = {
+        "ocr": Stage("ocr", ocr_workers, ocr_rpm),
+        "llm": Stage("llm", llm_workers, llm_rpm),
+    }
+    done = load_checkpoint(output_path)
+    write_lock = threading.Lock()
+    summary = {"total": len(files), "skipped": 0, "ok": 0, "error": 0}
+    if split_forms:
+        summary["forms"] = 0
+
+    def job(path: str) -> list:
+        try:
+            with open(path, "rb") as f:
+                file_bytes = f.read()
+        except OSError as e:
+            return [{"file": path, "status": "error", "error": f"read failed: {e}"}]
+
+        file_hash = sha256_hex(file_bytes)
+        if file_hash in done:
+            return []
+
+        try:
+            if split_forms:
+                return process_bundle(path, file_bytes, file_hash, stages, language, done)
+            return [process_document(path, file_bytes, file_hash, stages, language)]
+        except Exception as e:
+            logger.exception("Batch processing failed for %s", path)
+            return [{"file": path, "sha256": file_hash, "status": "error", "error": str(e)}]
+
+    start = time.perf_counter()
+    # Enough threads to keep both stages saturated; the stages bound the actual concurrency
+    with ThreadPoolExecutor(max_workers=ocr_workers + llm_workers) as executor, \
+            open(output_path, "a", encoding="utf-8") as out:
+        futures = {executor.submit(job, path): path for path in files}
+        for future in as_completed(futures):
+            records = future.result()
+            if not records:
+                summary["skipped"] += 1
+                continue
+
+            # A bundle counts as an error when any of its forms failed
+            status = "ok" if all(record["status"] == "ok" for record in records) else "error"
+            summary[status] += 1
+            if split_forms:
+                summary["forms"] += len(records)
+            with write_lock:
+                for record in records:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+            logger.info(
+                "Batch progress: %d/%d (%s: %s, forms=%d)",
+                summary["ok"] + summary["error"] + summary["skipped"], len(files),
+                status, futures[future], len(records)
+            )
+
+    summary["elapsed_s"] = round(time.perf_counter() - start, 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="directory of forms or manifest file")
+    parser.add_argument("--output", required=True, help="JSONL results file (also the resume checkpoint)")
+    parser.add_argument("--ocr-workers", type=int, default=4)
+    parser.add_argument("--llm-workers", type=int, default=8)
+    parser.add_argument("--ocr-rpm", type=float, default=0, help="max OCR requests per minute (0 = unlimited)")
+    parser.add_argument("--llm-rpm", type=float, default=0, help="max LLM requests per minute (0 = unlimited)")
+    parser.add_argument("--language", default="english", choices=["english", "hebrew"])
+    parser.add_argument("--split-forms", action="store_true",
+                        help="detect several stapled forms per PDF and extract each one (one record per form)")
+    args = parser.parse_args()
+
+    setup_logging()
+
+    files = collect_inputs(args.input)
+    logger.info("Batch extraction started (files=%d, output=%s)", len(files), args.output)
+
+    try:
+        summary = run_batch(
+            files, args.output, args.ocr_workers, args.llm_workers,
+            args.ocr_rpm, args.llm_rpm, args.language, args.split_forms
+        )
+    finally:
+        close_clients()
+
+    logger.info("Batch extraction finished: %s", summary)
+    print(json.dumps(summary))
+    return 0 if summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Microbenchmark: per-call Azure client construction vs the shared pooled clients.
+
+Each "document" is one Document Intelligence analyze (submit + poll) and one
+chat completion against the local stub server. The "per-call" mode builds new
+DocumentAnalysisClient / AzureOpenAI instances for every document, as ocr.py
+and llm_extractor.py used to; "shared" goes through azure_clients.py.
+Use --tls to include TLS handshakes (self-signed localhost certificate).
+
+Run from the project root:
+    python part1/benchmarks/bench_clients.py --documents 30 --latency 0.05 --tls
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.core.credentials import AzureKeyCredential
+from openai import AzureOpenAI
+
+from azure_clients import get_document_client, get_openai_client, close_clients
+from stub_azure_server import StubServer, create_stub_app
+
+API_KEY = "stub-key"
+MESSAGES = [{"role": "user", "content": "extract"}]
+
+
+def process_per_call(url: str):
+    with DocumentAnalysisClient(endpoint=url, credential=AzureKeyCredential(API_KEY)) as doc_client:
+        doc_client.begin_analyze_document("prebuilt-layout", b"%PDF-stub").result()
+    with AzureOpenAI(azure_endpoint=url, api_key=API_KEY, api_version="2024-02-15-preview") as llm_client:
+        llm_client.chat.completions.create(model="gpt-4o", messages=MESSAGES, temperature=0)
+
+
+def process_shared(url: str):
+    get_document_client(url, API_KEY).begin_analyze_document("prebuilt-layout", b"%PDF-stub").result()
+    get_openai_client(url, API_KEY).chat.completions.create(model="gpt-4o", messages=MESSAGES, temperature=0)
+
+
+def measure(fn, url: str, documents: int) -> list:
+    fn(url)  # warm-up (imports, first pool fill for the shared clients)
+    timings = []
+    for _ in range(documents):
+        start = time.perf_counter()
+        fn(url)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub service latency (seconds)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--tls", action="store_true", help="serve the stub over HTTPS")
+    args = parser.parse_args()
+
+    with StubServer(create_stub_app(latency=args.latency), port=args.port, tls=args.tls) as stub:
+        if args.tls:
+            # Trust the throwaway certificate in both requests (Form Recognizer) and httpx (OpenAI)
+            os.environ["REQUESTS_CA_BUNDLE"] = stub.cert_path
+            os.environ["SSL_CERT_FILE"] = stub.cert_path
+
+        per_call = measure(process_per_call, stub.url, args.documents)
+        shared = measure(process_shared, stub.url, args.documents)
+        close_clients()
+
+    print(f"documents={args.documents} stub_latency={args.latency}s tls={args.tls}")
+    print(f"{'mode':<10}{'mean_ms':>10}{'p50_ms':>10}{'max_ms':>10}")
+    for name, timings in (("per-call", per_call), ("shared", shared)):
+        print(
+            f"{name:<10}{statistics.mean(timings) * 1000:>10.1f}"
+            f"{statistics.median(timings) * 1000:>10.1f}{max(timings) * 1000:>10.1f}"
+        )
+    print(f"saved per document: {(statistics.mean(per_call) - statistics.mean(shared)) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: upload size / OCR latency / accuracy with and without image pre-processing.
+
+Each sample form (page 1) is rendered as a simulated phone photo: --photo-dpi
+resolution, high-quality JPEG, stored rotated with an EXIF orientation tag.
+For every photo it reports the bytes before/after preprocess_image, the time
+the pre-processing takes, and PSNR of the processed image against the
+original (offline fidelity proxy). With --ocr it also runs Document
+Intelligence on both versions (needs the Azure credentials from .env) and
+reports OCR latency and recall of the form's filled-in values, taken from
+the PDF text layer.
+
+Rendering needs pypdfium2 (pip install pypdfium2). Run from the project root:
+    python part1/benchmarks/bench_image_preprocess.py --photo-dpi 400 [--ocr]
+"""
+import os
+import sys
+import glob
+import re
+import math
+import time
+import argparse
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageOps, ImageStat
+
+from image_preprocess import preprocess_image
+from ocr_layout import load_template_vocabulary
+from text_layer import read_text_layers, fix_visual_hebrew
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "phase1_data")
+EXIF_ORIENTATION = 0x0112
+NUMERIC_VALUE_RE = re.compile(r"[\d.:/ ]{4,}")
+
+
+def render_photo(pdf_path: str, dpi: int) -> bytes:
+    """Page 1 as a phone-style JPEG: pixels stored rotated, EXIF orientation 6 to display upright."""
+    import pypdfium2
+
+    page = pypdfium2.PdfDocument(pdf_path)[0]
+    image = page.render(scale=dpi / 72).to_pil().convert("RGB")
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    buffer = BytesIO()
+    image.rotate(90, expand=True).save(buffer, format="JPEG", quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+def psnr(original_bytes: bytes, processed_bytes: bytes) -> float:
+    """PSNR (dB) of the processed image, upscaled back, against the upright grayscale original."""
+    original = ImageOps.exif_transpose(Image.open(BytesIO(original_bytes))).convert("L")
+    processed = Image.open(BytesIO(processed_bytes)).convert("L").resize(original.size, Image.Resampling.LANCZOS)
+    rms = ImageStat.Stat(ImageChops.difference(original, processed)).rms[0]
+    return float("inf") if rms == 0 else 20 * math.log10(255 / rms)
+
+
+def filled_values(pdf_path: str) -> list:
+    """Filled-in values of a sample form: page 1 text-layer lines with words foreign to the blank form, or numbers."""
+    vocabulary = load_template_vocabulary()
+    with open(pdf_path, "rb") as f:
+        text = read_text_layers(f.read())[0]
+    lines = fix_visual_hebrew([line.strip() for line in text.splitlines() if line.strip()], vocabulary)
+    return [
+        line for line in lines
+        if NUMERIC_VALUE_RE.fullmatch(line) or any(word not in vocabulary for word in re.findall(r"[א-ת]+", line))
+    ]
+
+
+def recall(values: list, ocr_text: str) -> float:
+    normalized = " ".join(ocr_text.split())
+    return sum(1 for value in values if " ".join(value.split()) in normalized) / len(values) if values else 1.0
+
+
+def run_ocr(file_bytes: bytes) -> tuple:
+    from ocr import extract_text_from_document
+    from part1_config import DOC_INTEL_ENDPOINT, DOC_INTEL_KEY
+
+    start = time.perf_counter()
+    text = extract_text_from_document(file_bytes, DOC_INTEL_ENDPOINT, DOC_INTEL_KEY, mode="text")
+    return text, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--photo-dpi", type=int, default=400, help="resolution of the simulated photos")
+    parser.add_argument("--ocr", action="store_true", help="also run Azure OCR on both versions")
+    args = parser.parse_args()
+
+    header = f"{'form':<14}{'orig_kb':>9}{'prep_kb':>9}{'prep_ms':>9}{'psnr_db':>9}"
+    if args.ocr:
+        header += f"{'ocr_s':>8}{'prep_ocr_s':>11}{'recall':>8}{'prep_recall':>12}"
+    print(header)
+
+    for pdf_path in sorted(glob.glob(os.path.join(DATA_DIR, "283_ex*.pdf"))):
+        photo = render_photo(pdf_path, args.photo_dpi)
+        start = time.perf_counter()
+        processed = preprocess_image(photo)
+        prep_ms = (time.perf_counter() - start) * 1000
+
+        row = (
+            f"{os.path.basename(pdf_path):<14}{len(photo) / 1024:>9.0f}{len(processed) / 1024:>9.0f}"
+            f"{prep_ms:>9.0f}{psnr(photo, processed):>9.1f}"
+        )
+        if args.ocr:
+            values = filled_values(pdf_path)
+            original_text, original_s = run_ocr(photo)
+            processed_text, processed_s = run_ocr(processed)
+            row += (
+                f"{original_s:>8.2f}{processed_s:>11.2f}"
+                f"{recall(values, original_text):>8.2f}{recall(values, processed_text):>12.2f}"
+            )
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Prompt-size / latency comparison: full OCR text vs compact layout-aware OCR.
+
+For every form it runs OCR in both modes ("text" and "compact", see ocr.py),
+sends each result through the extraction prompt and reports OCR characters,
+prompt tokens (usage.prompt_tokens) and LLM latency. Needs the real Azure
+credentials from .env (part1_config.py).
+
+Run from the project root:
+    python part1/benchmarks/bench_ocr_compact.py part1/phase1_data/283_ex1.pdf part1/phase1_data/283_ex2.pdf
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr import extract_text_from_document
+from llm_extractor import get_system_prompt, get_response_format
+from azure_clients import get_openai_client, close_clients
+from part1_config import DOC_INTEL_ENDPOINT, DOC_INTEL_KEY, AOAI_ENDPOINT, AOAI_KEY, AOAI_DEPLOYMENT
+
+MODES = ("text", "compact")
+
+
+def measure(path: str, mode: str) -> dict:
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+
+    start = time.perf_counter()
+    ocr_text = extract_text_from_document(file_bytes, DOC_INTEL_ENDPOINT, DOC_INTEL_KEY, mode=mode)
+    ocr_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = get_openai_client(AOAI_ENDPOINT, AOAI_KEY).chat.completions.create(
+        model=AOAI_DEPLOYMENT,
+        messages=[
+            {"role": "system", "content": get_system_prompt()},
+            {"role": "user", "content": f"OCR TEXT:\n{ocr_text}"}
+        ],
+        temperature=0,
+        response_format=get_response_format()
+    )
+    llm_s = time.perf_counter() - start
+
+    return {
+        "chars": len(ocr_text),
+        "prompt_tokens": response.usage.prompt_tokens,
+        "ocr_s": ocr_s,
+        "llm_s": llm_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="forms to compare (PDF/JPG/PNG)")
+    args = parser.parse_args()
+
+    print(f"{'file':<20}{'mode':<9}{'chars':>8}{'prompt_tok':>12}{'ocr_s':>8}{'llm_s':>8}")
+    totals = {mode: {"prompt_tokens": 0, "llm_s": 0.0} for mode in MODES}
+    try:
+        for path in args.files:
+            for mode in MODES:
+                row = measure(path, mode)
+                totals[mode]["prompt_tokens"] += row["prompt_tokens"]
+                totals[mode]["llm_s"] += row["llm_s"]
+                print(
+                    f"{os.path.basename(path):<20}{mode:<9}{row['chars']:>8}{row['prompt_tokens']:>12}"
+                    f"{row['ocr_s']:>8.2f}{row['llm_s']:>8.2f}"
+                )
+    finally:
+        close_clients()
+
+    text, compact = totals["text"], totals["compact"]
+    if text["prompt_tokens"]:
+        print(f"prompt tokens: -{(1 - compact['prompt_tokens'] / text['prompt_tokens']) * 100:.1f}%")
+    if text["llm_s"]:
+        print(f"LLM latency:   -{(1 - compact['llm_s'] / text['llm_s']) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: single-request OCR vs page-parallel OCR for multi-page PDFs.
+
+Builds an N-page PDF and runs extract_text_from_document against the local
+stub server, whose analyze latency grows with the number of pages uploaded
+(--page-latency per page), once per OCR_PAGE_WORKERS setting.
+
+Run from the project root:
+    python part1/benchmarks/bench_ocr_pages.py --pages 12 --page-latency 0.25 --workers 1 2 4 8
+"""
+import os
+import sys
+import time
+import argparse
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfWriter
+
+import ocr
+from azure_clients import close_clients
+from stub_azure_server import StubServer, create_stub_app
+
+API_KEY = "stub-key"
+
+
+def build_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--pages-per-request", type=int, default=ocr.OCR_PAGES_PER_REQUEST)
+    parser.add_argument("--page-latency", type=float, default=0.25, help="stub analyze latency per page (seconds)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    pdf_bytes = build_pdf(args.pages)
+    ocr.OCR_PAGES_PER_REQUEST = args.pages_per_request
+
+    print(f"pages={args.pages} pages_per_request={args.pages_per_request} page_latency={args.page_latency}s")
+    print(f"{'workers':<10}{'wall_s':>10}")
+    with StubServer(create_stub_app(latency=0.0, page_latency=args.page_latency), port=args.port) as stub:
+        ocr.extract_text_from_document(pdf_bytes, stub.url, API_KEY)  # warm-up (client, pool)
+        for workers in args.workers:
+            ocr.OCR_PAGE_WORKERS = workers
+            start = time.perf_counter()
+            ocr.extract_text_from_document(pdf_bytes, stub.url, API_KEY)
+            print(f"{workers:<10}{time.perf_counter() - start:>10.2f}")
+        close_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark: the full Part 1 pipeline (OCR -> LLM -> validation -> translation)
+offline, against the local stub server replaying responses for the
+phase1_data sample forms.
+
+For every form with a gold file in benchmarks/gold/, the stub replays:
+  - OCR: recordings/<name>.layout.json when present (a recorded analyzeResult,
+    or the whole REST response holding one); otherwise a layout result built
+    from the PDF's text layer (visual Hebrew put back in logical order).
+  - LLM: recordings/<name>.chat.json when present (a recorded completion
+    content); otherwise the gold JSON itself. Such forms are reported as
+    "merge-only": mismatches then come from OCR + rule pre-extraction +
+    merging, and no accuracy figure is printed for them (record real
+    completions with record_responses.py to measure accuracy).
+Completions are matched on the gold ID number appearing in the prompt.
+
+Reports per-stage latency percentiles and throughput for each concurrency
+level, then field-level accuracy against the gold JSON for recorded forms.
+
+Run from the project root:
+    python part1/benchmarks/bench_pipeline.py --concurrency 1 4 8 16 --documents 24 \\
+        --ocr-latency 0.8 --llm-latency 1.5 --jitter 0.3 --error-rate 0.05
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_azure_server import StubServer, create_stub_app, make_layout_result
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLD_DIR = os.path.join(BENCH_DIR, "gold")
+RECORDINGS_DIR = os.path.join(BENCH_DIR, "recordings")
+DATA_DIR = os.path.join(os.path.dirname(BENCH_DIR), "phase1_data")
+API_KEY = "stub-key"
+STAGES = ("ocr_s", "llm_s", "validation_s", "translation_s", "total_s")
+
+
+def configure_environment(url: str):
+    """Point part1_config at the stub; must run before the pipeline modules are imported."""
+    os.environ["DOC_INTEL_ENDPOINT"] = url
+    os.environ["DOC_INTEL_KEY"] = API_KEY
+    os.environ["AOAI_ENDPOINT"] = url
+    os.environ["AOAI_KEY"] = API_KEY
+
+
+def load_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def text_layer_result(file_bytes: bytes) -> dict:
+    from text_layer import read_text_layers, fix_visual_hebrew
+
+    pages = []
+    for text in read_text_layers(file_bytes):
+        pages.append(fix_visual_hebrew([line.strip() for line in text.splitlines() if line.strip()]))
+    return make_layout_result(pages)
+
+
+def load_fixtures() -> list:
+    """[{name, file_bytes, gold, layout, chat, sources}] for every gold form."""
+    fixtures = []
+    for gold_name in sorted(os.listdir(GOLD_DIR)):
+        name = os.path.splitext(gold_name)[0]
+        with open(os.path.join(DATA_DIR, name + ".pdf"), "rb") as f:
+            file_bytes = f.read()
+        gold = load_json(os.path.join(GOLD_DIR, gold_name))
+
+        layout_path = os.path.join(RECORDINGS_DIR, name + ".layout.json")
+        chat_path = os.path.join(RECORDINGS_DIR, name + ".chat.json")
+        if os.path.exists(layout_path):
+            layout = load_json(layout_path)
+            layout = layout.get("analyzeResult", layout)
+        else:
+            layout = text_layer_result(file_bytes)
+        chat = load_json(chat_path) if os.path.exists(chat_path) else gold
+
+        fixtures.append({
+            "name": name, "file_bytes": file_bytes, "gold": gold, "layout": layout,
+            "chat": json.dumps(chat, ensure_ascii=False),
+            "sources": ("recorded" if os.path.exists(layout_path) else "text-layer",
+                        "recorded" if os.path.exists(chat_path) else "gold"),
+        })
+    return fixtures
+
+
+def percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(share * len(ordered)), len(ordered) - 1)]
+
+
+def run_level(fixtures: list, concurrency: int, documents: int, language: str) -> dict:
+    from batch_extract import Stage, process_document
+
+    stages = {"ocr": Stage("ocr", concurrency, 0), "llm": Stage("llm", concurrency, 0)}
+
+    def job(index: int):
+        fixture = fixtures[index % len(fixtures)]
+        start = time.perf_counter()
+        try:
+            record = process_document(fixture["name"], fixture["file_bytes"], "", stages, language)
+        except Exception as e:
+            return fixture, None, str(e)
+        record["timings"]["total_s"] = time.perf_counter() - start
+        return fixture, record, None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(job, range(documents)))
+    wall = time.perf_counter() - start
+
+    records = [record for _, record, error in results if error is None]
+    return {
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "throughput": len(records) / wall,
+        "errors": [error for _, _, error in results if error is not None],
+        "timings": {stage: [r["timings"].get(stage, 0.0) for r in records] for stage in STAGES},
+        "results": results,
+    }
+
+
+def field_values(data: dict) -> dict:
+    """Flat {"address.city": value} view of an extracted form (any key language)."""
+    from columnar_export import column_plan, key_paths, detect_language
+
+    values = {}
+    for column, path in zip(column_plan(), key_paths(detect_language(data))):
+        value = data
+        for key in path:
+            value = value.get(key, "") if isinstance(value, dict) else ""
+        values[column.name] = " ".join(str(value).split())
+    return values
+
+
+def accuracy(fixtures: list, results: list) -> dict:
+    """Per form: (matching fields, total fields, mismatched field names) of its first successful record."""
+    report = {}
+    for fixture, record, error in results:
+        if error is not None or fixture["name"] in report:
+            continue
+        expected = field_values(fixture["gold"])
+        actual = field_values(record["extracted"])
+        mismatched = [field for field in expected if expected[field] != actual[field]]
+        report[fixture["name"]] = (len(expected) - len(mismatched), len(expected), mismatched)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--documents", type=int, default=24, help="documents per concurrency level")
+    parser.add_argument("--ocr-latency", type=float, default=0.8, help="stub analyze latency (seconds)")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="extra stub analyze latency per page")
+    parser.add_argument("--llm-latency", type=float, default=1.5, help="stub chat latency (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="latency scaled by a uniform factor in 1 +/- jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of stub calls failing with --error-status")
+    parser.add_argument("--error-status", type=int, default=429, choices=[429, 500, 503])
+    parser.add_argument("--seed", type=int, default=283)
+    parser.add_argument("--language", default="english", choices=["english", "hebrew"])
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        latency=args.ocr_latency, chat_latency=args.llm_latency, page_latency=args.page_latency,
+        jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status, seed=args.seed
+    )
+    with StubServer(app, port=args.port) as stub:
+        configure_environment(stub.url)
+        from azure_clients import close_clients
+
+        fixtures = load_fixtures()
+        for fixture in fixtures:
+            app.state.register_result(fixture["file_bytes"], fixture["layout"])
+            app.state.register_completion([fixture["gold"]["idNumber"]], fixture["chat"])
+            print(f"{fixture['name']}: ocr={fixture['sources'][0]} llm={fixture['sources'][1]}")
+
+        run_level(fixtures, 1, len(fixtures), args.language)  # warm-up (clients, pools, template vocabulary)
+        app.state.stats.update(dict.fromkeys(app.state.stats, 0))
+
+        print(f"\nocr_latency={args.ocr_latency}s llm_latency={args.llm_latency}s jitter={args.jitter} "
+              f"error_rate={args.error_rate} ({args.error_status}) documents={args.documents}")
+        print(f"{'conc':<6}{'stage':<15}{'p50_ms':>9}{'p90_ms':>9}{'p99_ms':>9}{'mean_ms':>9}")
+        levels = []
+        for concurrency in args.concurrency:
+            level = run_level(fixtures, concurrency, args.documents, args.language)
+            levels.append(level)
+            for stage in STAGES:
+                values = [v * 1000 for v in level["timings"][stage]] or [0.0]
+                print(f"{concurrency:<6}{stage:<15}{percentile(values, 0.5):>9.1f}{percentile(values, 0.9):>9.1f}"
+                      f"{percentile(values, 0.99):>9.1f}{statistics.mean(values):>9.1f}")
+
+        print(f"\n{'conc':<6}{'wall_s':>8}{'docs/s':>8}{'errors':>8}")
+        for level in levels:
+            print(f"{level['concurrency']:<6}{level['wall_s']:>8.2f}{level['throughput']:>8.2f}{len(level['errors']):>8}")
+        print(f"stub calls: {app.state.stats}")
+
+        print(f"\n{'form':<10}{'accuracy':>12}  mismatched fields")
+        sources = {fixture["name"]: fixture["sources"] for fixture in fixtures}
+        matched = total = 0
+        for name, (ok, count, mismatched) in accuracy(fixtures, levels[-1]["results"]).items():
+            if sources[name][1] == "gold":
+                # The stub answered with the gold JSON: this only checks OCR + rules + merging
+                print(f"{name:<10}{'merge-only':>12}  {', '.join(mismatched) or '-'}")
+                continue
+            matched, total = matched + ok, total + count
+            print(f"{name:<10}{ok / count:>12.1%}  {', '.join(mismatched) or '-'}")
+        if total:
+            print(f"{'overall':<10}{matched / total:>12.1%}")
+        else:
+            print("no recorded completions (benchmarks/recordings): merge-only, not accuracy")
+        close_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Record live Azure responses for the benchmark replay (bench_pipeline.py).
+
+For each PDF, saves into benchmarks/recordings/:
+  <name>.layout.json  the prebuilt-layout analyzeResult (REST API JSON)
+  <name>.chat.json    the fields extracted by AOAI_DEPLOYMENT from that OCR text
+Needs the real DOC_INTEL_* / AOAI_* settings (.env).
+
+Run from the project root:
+    python part1/benchmarks/record_responses.py part1/phase1_data/283_ex1.pdf part1/phase1_data/283_ex2.pdf
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from logging_config import setup_logging
+from llm_extractor import extract_fields_with_llm
+from azure_clients import close_clients
+from part1_config import DOC_INTEL_ENDPOINT, DOC_INTEL_KEY, AOAI_ENDPOINT, AOAI_KEY, AOAI_DEPLOYMENT
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+API_VERSION = "2023-07-31"
+
+
+def record_layout(file_bytes: bytes) -> dict:
+    """Run prebuilt-layout through the REST API and return the raw analyzeResult."""
+    headers = {"Ocp-Apim-Subscription-Key": DOC_INTEL_KEY, "Content-Type": "application/octet-stream"}
+    url = f"{DOC_INTEL_ENDPOINT.rstrip('/')}/formrecognizer/documentModels/prebuilt-layout:analyze?api-version={API_VERSION}"
+    response = requests.post(url, data=file_bytes, headers=headers, timeout=60)
+    response.raise_for_status()
+    operation_url = response.headers["Operation-Location"]
+
+    while True:
+        time.sleep(1)
+        status = requests.get(operation_url, headers=headers, timeout=60)
+        status.raise_for_status()
+        body = status.json()
+        if body["status"] == "succeeded":
+            return body["analyzeResult"]
+        if body["status"] == "failed":
+            raise RuntimeError(f"Analyze failed: {body.get('error')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="+")
+    args = parser.parse_args()
+
+    setup_logging()
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    try:
+        for path in args.pdfs:
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, "rb") as f:
+                layout = record_layout(f.read())
+            ocr_text = "\n".join(line["content"] for page in layout["pages"] for line in page["lines"])
+            extracted = extract_fields_with_llm(ocr_text, AOAI_ENDPOINT, AOAI_KEY, AOAI_DEPLOYMENT)
+
+            for suffix, data in (("layout", layout), ("chat", extracted)):
+                with open(os.path.join(RECORDINGS_DIR, f"{name}.{suffix}.json"), "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+            print(f"{name}: recorded ({len(ocr_text)} OCR characters)")
+    finally:
+        close_clients()
+
+
+if __name__ == "__main__":
+    main()
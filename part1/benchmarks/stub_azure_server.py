@@ -0,0 +1,300 @@
+"""
+Local stand-in for the Azure services used by Part 1.
+
+Implements just enough of the Document Intelligence analyze/poll protocol and
+of the Azure OpenAI chat completions API for the real SDK clients to run
+against it, with a configurable artificial latency (fixed per call, plus an
+optional per-page share for PDF uploads and random jitter).
+
+Replay: analyze requests whose uploaded document matches a registered one
+(by SHA-256) get its recorded analyzeResult; chat requests whose messages
+contain all the `match` strings of a registered completion get its content.
+Anything else gets the default result / content.
+
+Error injection: a share (error_rate) of analyze and chat submissions fail
+with error_status, which the SDK retry policies see as throttling / outages.
+"""
+import os
+import time
+import json
+import uuid
+import random
+import asyncio
+import hashlib
+import tempfile
+import threading
+from io import BytesIO
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DI_API_PREFIX = "/formrecognizer/documentModels"
+
+
+def make_layout_result(pages: list, model_id: str = "prebuilt-layout") -> dict:
+    """Minimal analyzeResult with one page per entry of `pages` (each a list of text lines)."""
+    content_parts = []
+    result_pages = []
+    offset = 0
+    for page_number, lines in enumerate(pages, start=1):
+        page_start = offset
+        page_lines = []
+        for line in lines:
+            page_lines.append({
+                "content": line,
+                "polygon": [0, 0, 1, 0, 1, 1, 0, 1],
+                "spans": [{"offset": offset, "length": len(line)}]
+            })
+            content_parts.append(line)
+            offset += len(line) + 1
+        result_pages.append({
+            "pageNumber": page_number, "angle": 0, "width": 8.5, "height": 11, "unit": "inch",
+            "spans": [{"offset": page_start, "length": max(offset - page_start - 1, 0)}],
+            "words": [], "selectionMarks": [], "lines": page_lines
+        })
+
+    return {
+        "apiVersion": "2023-07-31",
+        "modelId": model_id,
+        "stringIndexType": "unicodeCodePoint",
+        "content": "\n".join(content_parts),
+        "pages": result_pages,
+        "tables": [], "paragraphs": [], "styles": [], "keyValuePairs": []
+    }
+
+
+def make_analyze_result(lines: list, model_id: str = "prebuilt-layout") -> dict:
+    """Minimal single-page analyzeResult holding `lines` of text."""
+    return make_layout_result([lines], model_id)
+
+
+def count_pdf_pages(body: bytes) -> int:
+    """Page count of an uploaded PDF (1 for images or unreadable bodies)."""
+    if not body.startswith(b"%PDF"):
+        return 1
+    try:
+        from pypdf import PdfReader
+
+        return max(len(PdfReader(BytesIO(body)).pages), 1)
+    except Exception:
+        return 1
+
+
+def _chat_chunk(deployment: str, delta: dict = None, usage: dict = None) -> str:
+    choices = [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": None}]
+    payload = {
+        "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+        "model": deployment, "choices": choices, "usage": usage
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def _injected_error(status: int) -> JSONResponse:
+    code = "TooManyRequests" if status == 429 else "ServiceUnavailable"
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"code": code, "message": "injected by stub"}},
+        headers={"retry-after-ms": "100", "Retry-After": "0"}
+    )
+
+
+def create_stub_app(latency: float = 0.2, analyze_result: dict = None, chat_content: str = "{}",
+                    page_latency: float = 0.0, stream_chunk_chars: int = 8, chat_latency: float = None,
+                    jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 429,
+                    seed: int = None) -> FastAPI:
+    """
+    `latency` applies to analyze operations (and to chat unless `chat_latency` is set);
+    every latency is scaled by a uniform factor in [1 - jitter, 1 + jitter].
+    """
+    app = FastAPI(title="Azure stub (Document Intelligence + OpenAI)")
+    app.state.latency = latency
+    app.state.chat_latency = latency if chat_latency is None else chat_latency
+    app.state.page_latency = page_latency
+    app.state.jitter = jitter
+    app.state.error_rate = error_rate
+    app.state.error_status = error_status
+    app.state.analyze_result = analyze_result or make_analyze_result(["stub OCR line"])
+    app.state.chat_content = chat_content
+    app.state.replay_results = {}       # document SHA-256 -> analyzeResult
+    app.state.replay_completions = []   # (match strings, content)
+    app.state.stats = {"analyze": 0, "chat": 0, "replayed_analyze": 0, "replayed_chat": 0, "errors": 0}
+    rng = random.Random(seed)
+    operations = {}
+
+    def jittered(value: float) -> float:
+        if not app.state.jitter:
+            return value
+        return value * rng.uniform(1 - app.state.jitter, 1 + app.state.jitter)
+
+    def inject_error() -> bool:
+        if app.state.error_rate and rng.random() < app.state.error_rate:
+            app.state.stats["errors"] += 1
+            return True
+        return False
+
+    def register_result(document: bytes, result: dict):
+        """Replay `result` for analyze requests uploading exactly `document`."""
+        app.state.replay_results[hashlib.sha256(document).hexdigest()] = result
+
+    def register_completion(match: list, content: str):
+        """Replay `content` for chat requests whose messages contain every string of `match`."""
+        app.state.replay_completions.append((list(match), content))
+
+    app.state.register_result = register_result
+    app.state.register_completion = register_completion
+
+    @app.post(DI_API_PREFIX + "/{model_id}:analyze")
+    async def analyze(model_id: str, request: Request):
+        body = await request.body()
+        app.state.stats["analyze"] += 1
+        if inject_error():
+            return _injected_error(app.state.error_status)
+
+        result = app.state.replay_results.get(hashlib.sha256(body).hexdigest())
+        if result is not None:
+            app.state.stats["replayed_analyze"] += 1
+        latency = app.state.latency
+        if app.state.page_latency:
+            latency += app.state.page_latency * count_pdf_pages(body)
+        operation_id = uuid.uuid4().hex
+        operations[operation_id] = (time.monotonic() + jittered(latency), result or app.state.analyze_result)
+        location = f"{str(request.base_url).rstrip('/')}{DI_API_PREFIX}/{model_id}/analyzeResults/{operation_id}?api-version=2023-07-31"
+        # retry-after-ms keeps the SDK poller from falling back to its 5s default interval
+        return JSONResponse(status_code=202, content={}, headers={
+            "Operation-Location": location, "retry-after-ms": "20"
+        })
+
+    @app.get(DI_API_PREFIX + "/{model_id}/analyzeResults/{operation_id}")
+    async def analyze_result(model_id: str, operation_id: str):
+        operation = operations.get(operation_id)
+        if operation is None:
+            return JSONResponse(status_code=404, content={"error": {"code": "NotFound", "message": "unknown operation"}})
+        ready_at, result = operation
+
+        now_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        if time.monotonic() < ready_at:
+            return JSONResponse(
+                content={"status": "running", "createdDateTime": now_iso, "lastUpdatedDateTime": now_iso},
+                headers={"retry-after-ms": "20"}
+            )
+
+        operations.pop(operation_id, None)
+        return {
+            "status": "succeeded",
+            "createdDateTime": now_iso,
+            "lastUpdatedDateTime": now_iso,
+            "analyzeResult": result
+        }
+
+    def replay_content(body: dict) -> str:
+        text = "\n".join(
+            message["content"] for message in body.get("messages", []) if isinstance(message.get("content"), str)
+        )
+        for match, content in app.state.replay_completions:
+            if all(value in text for value in match):
+                app.state.stats["replayed_chat"] += 1
+                return content
+        return app.state.chat_content
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        app.state.stats["chat"] += 1
+        if inject_error():
+            return _injected_error(app.state.error_status)
+
+        usage = {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200}
+        content = replay_content(body)
+        latency = jittered(app.state.chat_latency)
+
+        if body.get("stream"):
+            async def events():
+                # Time to first token = latency, then the content spread over another latency
+                await asyncio.sleep(latency)
+                pieces = [content[i:i + stream_chunk_chars] for i in range(0, len(content), stream_chunk_chars)]
+                yield _chat_chunk(deployment, {"role": "assistant", "content": ""})
+                for piece in pieces:
+                    await asyncio.sleep(latency / max(len(pieces), 1))
+                    yield _chat_chunk(deployment, {"content": piece})
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    yield _chat_chunk(deployment, usage=usage)
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content}
+            }],
+            "usage": usage
+        }
+
+    return app
+
+
+def write_self_signed_cert() -> tuple:
+    """Create a throwaway localhost certificate so TLS handshake cost can be measured."""
+    import datetime
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .sign(private_key, hashes.SHA256())
+    )
+
+    cert_dir = tempfile.mkdtemp(prefix="stub_tls_")
+    cert_path = os.path.join(cert_dir, "cert.pem")
+    key_path = os.path.join(cert_dir, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+class StubServer:
+    """Run the stub app with uvicorn in a background thread (optionally over TLS)."""
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 8766, tls: bool = False):
+        kwargs = {}
+        if tls:
+            self.cert_path, key_path = write_self_signed_cert()
+            kwargs = {"ssl_certfile": self.cert_path, "ssl_keyfile": key_path}
+            host = "localhost"
+        self.url = f"{'https' if tls else 'http'}://{host}:{port}"
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning", **kwargs)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
@@ -0,0 +1,207 @@
+"""
+Columnar export of extracted forms.
+
+The InjuryForm schema is compiled once into a flat column plan
+("address.city", "dateOfInjury.year", ...). Extracted results accumulate
+column-wise into Arrow record batches and are written to Parquet; the
+completeness score and missing required fields are computed with Arrow
+compute kernels over each whole batch. Column headers can be Hebrew
+(from LANGUAGE_MAPPINGS), mapped once per plan.
+
+Convert batch_extract.py output (from the project root):
+    python part1/columnar_export.py --input results.jsonl --output forms.parquet --headers hebrew
+"""
+import sys
+import json
+import argparse
+import logging
+from collections import namedtuple
+from functools import lru_cache
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+from schema import InjuryForm
+from validation import REQUIRED_FIELDS
+from form_translator import LANGUAGE_MAPPINGS
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+Column = namedtuple("Column", ["name", "path"])
+
+META_COLUMNS = ("file", "sha256")
+DEFAULT_BATCH_SIZE = 10_000
+
+
+@lru_cache(maxsize=None)
+def column_plan() -> tuple:
+    """Leaf fields of InjuryForm in schema order, e.g. Column("address.city", ("address", "city"))."""
+    def walk(model, prefix):
+        for name, field in model.model_fields.items():
+            path = prefix + (name,)
+            if isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel):
+                yield from walk(field.annotation, path)
+            else:
+                yield Column(".".join(path), path)
+
+    return tuple(walk(InjuryForm, ()))
+
+
+@lru_cache(maxsize=None)
+def key_paths(language: str = "english") -> tuple:
+    """Column key paths as they appear in a form dict translated to `language`."""
+    mapping = LANGUAGE_MAPPINGS.get(language.lower(), {})
+    return tuple(tuple(mapping.get(key, key) for key in column.path) for column in column_plan())
+
+
+@lru_cache(maxsize=None)
+def column_headers(language: str = "english") -> tuple:
+    """Output column names: the plan names with every segment mapped to `language`."""
+    return tuple(".".join(path) for path in key_paths(language))
+
+
+def detect_language(extracted: dict) -> str:
+    """Key language of an extracted dict (batch results may be translated)."""
+    if "firstName" in extracted:
+        return "english"
+    for language, mapping in LANGUAGE_MAPPINGS.items():
+        if mapping.get("firstName") in extracted:
+            return language
+    return "english"
+
+
+def _lookup(data: dict, path: tuple) -> str:
+    for key in path:
+        if not isinstance(data, dict):
+            return ""
+        data = data.get(key)
+    return data if isinstance(data, str) else ""
+
+
+def validate_columns(columns: dict) -> dict:
+    """
+    Vectorized validate_extraction over a batch: `columns` maps plan names to
+    string arrays. Returns completeness_score_percent and missing_required_fields
+    (comma-separated) arrays with the same semantics as validation.py.
+    """
+    filled = {
+        name: pc.greater(pc.utf8_length(pc.utf8_trim_whitespace(pc.fill_null(array, ""))), 0)
+        for name, array in columns.items()
+        if name not in META_COLUMNS
+    }
+    filled_count = None
+    for mask in filled.values():
+        as_int = pc.cast(mask, pa.int32())
+        filled_count = as_int if filled_count is None else pc.add(filled_count, as_int)
+    completeness = pc.round(pc.multiply(pc.divide(pc.cast(filled_count, pa.float64()), len(filled)), 100.0), 2)
+
+    missing_parts = []
+    for field in REQUIRED_FIELDS:
+        # Nested required fields (dates) need every sub-field filled
+        masks = [mask for name, mask in filled.items() if name == field or name.startswith(field + ".")]
+        present = masks[0]
+        for mask in masks[1:]:
+            present = pc.and_(present, mask)
+        missing_parts.append(pc.if_else(present, "", field + ","))
+    joined = pc.binary_join_element_wise(*missing_parts, "")
+    missing = pc.utf8_rtrim(joined, characters=",")
+
+    return {"completeness_score_percent": completeness, "missing_required_fields": missing}
+
+
+class ParquetFormWriter:
+    """
+    Accumulates extracted forms column-wise and writes them to Parquet in
+    record batches of `batch_size` rows, each with its validation columns.
+    """
+
+    def __init__(self, path: str, headers: str = "english", batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = 0
+        self._names = [column.name for column in column_plan()]
+        self._headers = list(META_COLUMNS) + list(column_headers(headers))
+        self._columns = {name: [] for name in list(META_COLUMNS) + self._names}
+        self._pending = 0
+        self._writer = None
+
+    def append(self, extracted: dict, file: str = "", sha256: str = ""):
+        """Add one extracted form (English or translated keys)."""
+        paths = key_paths(detect_language(extracted))
+        for name, path in zip(self._names, paths):
+            self._columns[name].append(_lookup(extracted, path))
+        self._columns["file"].append(file)
+        self._columns["sha256"].append(sha256)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        arrays = {name: pa.array(values, type=pa.string()) for name, values in self._columns.items()}
+        validation = validate_columns(arrays)
+
+        batch = pa.RecordBatch.from_arrays(
+            [arrays[name] for name in self._columns] + list(validation.values()),
+            names=self._headers + list(validation)
+        )
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, batch.schema, compression="zstd")
+        self._writer.write_batch(batch)
+
+        self.rows += self._pending
+        logger.info("Parquet batch written (rows=%d, total_rows=%d)", self._pending, self.rows)
+        self._columns = {name: [] for name in self._columns}
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_jsonl(input_path: str, output_path: str, headers: str = "english",
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write the successful records of a batch_extract.py JSONL file to Parquet. Returns the row count."""
+    with ParquetFormWriter(output_path, headers, batch_size) as writer, \
+            open(input_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed JSONL line")
+                continue
+            if record.get("status") == "ok":
+                writer.append(record["extracted"], record.get("file", ""), record.get("sha256", ""))
+    return writer.rows
+
+
+def main():
+    from logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="batch_extract.py JSONL results")
+    parser.add_argument("--output", required=True, help="Parquet file to write")
+    parser.add_argument("--headers", default="english", choices=["english"] + list(LANGUAGE_MAPPINGS))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    setup_logging()
+    rows = export_jsonl(args.input, args.output, args.headers, args.batch_size)
+    print(json.dumps({"rows": rows, "output": args.output}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
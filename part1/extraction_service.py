@@ -0,0 +1,222 @@
+"""
+REST extraction service for Part 1.
+
+Forms are submitted to POST /jobs and queued in SQLite (job_queue.py); the
+response carries the job id right away. A pool of EXTRACTION_WORKERS threads
+drains the queue through the same OCR -> LLM -> validation -> translation
+pipeline as batch_extract.py. Results are polled with GET /jobs/{job_id} or
+POSTed to the job's webhook_url when it finishes.
+
+Run from the project root:
+    uvicorn extraction_service:app --app-dir part1 --port 8001
+
+Submit a form:
+    curl -X POST --data-binary @form.pdf \\
+        "http://127.0.0.1:8001/jobs?file_name=form.pdf&language=hebrew&webhook_url=http://intake/hook"
+"""
+import time
+import asyncio
+import logging
+import threading
+from queue import Queue
+from contextlib import asynccontextmanager
+
+import requests
+from fastapi import FastAPI, Request, HTTPException
+
+from logging_config import setup_logging
+from job_queue import JobQueue
+from batch_extract import Stage, process_document
+from pipeline_cache import sha256_hex
+from azure_clients import close_clients
+from part1_config import (
+    JOBS_DB_PATH, JOBS_SPOOL_DIR, EXTRACTION_WORKERS, SERVICE_OCR_RPM, SERVICE_LLM_RPM,
+    MAX_UPLOAD_MB, WEBHOOK_TIMEOUT, WEBHOOK_RETRIES, WEBHOOK_WORKERS
+)
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+SUPPORTED_LANGUAGES = ("english", "hebrew")
+
+
+def notify_webhook(url: str, payload: dict, stop: threading.Event = None):
+    """POST the finished job to `url`, retrying with exponential backoff (cut short once `stop` is set)."""
+    stop = stop or threading.Event()
+    for attempt in range(1, WEBHOOK_RETRIES + 1):
+        try:
+            response = requests.post(url, json=payload, timeout=WEBHOOK_TIMEOUT)
+            response.raise_for_status()
+            logger.info("Webhook delivered (job_id=%s, status_code=%d)", payload["job_id"], response.status_code)
+            return
+        except requests.RequestException as e:
+            logger.warning(
+                "Webhook delivery failed (job_id=%s, attempt=%d/%d): %s",
+                payload["job_id"], attempt, WEBHOOK_RETRIES, e
+            )
+            if attempt < WEBHOOK_RETRIES and stop.wait(2 ** (attempt - 1)):
+                break
+    logger.error("Webhook delivery abandoned (job_id=%s, url=%s)", payload["job_id"], url)
+
+
+class WebhookDispatcher:
+    """
+    Delivers finished jobs to their webhook_url from its own threads, so extraction
+    workers go straight back to the queue instead of waiting on timeouts and backoff.
+    """
+
+    def __init__(self, workers: int = WEBHOOK_WORKERS):
+        self.workers = workers
+        self._pending = Queue()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"webhook-worker-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Webhook dispatcher started (workers=%d)", self.workers)
+
+    def submit(self, url: str, payload: dict):
+        self._pending.put((url, payload))
+
+    def stop(self, timeout: float = 10.0):
+        """Deliver what is queued within `timeout`, then abandon pending retries."""
+        for _ in self._threads:
+            self._pending.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        self._stop.set()
+        logger.info("Webhook dispatcher stopped")
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            try:
+                notify_webhook(*item, stop=self._stop)
+            except Exception:
+                logger.exception("Webhook delivery crashed (job_id=%s)", item[1].get("job_id"))
+
+
+class WorkerPool:
+    """Threads draining the job queue; `workers` bounds how many forms are processed at once."""
+
+    def __init__(self, queue: JobQueue, workers: int, stages: dict, webhooks: WebhookDispatcher):
+        self.queue = queue
+        self.workers = workers
+        self.stages = stages
+        self.webhooks = webhooks
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"extraction-worker-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Extraction worker pool started (workers=%d)", self.workers)
+
+    def stop(self, timeout: float = 30.0):
+        """Stop taking new jobs and wait for the running ones to finish."""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        logger.info("Extraction worker pool stopped")
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self.queue.claim(timeout=1.0)
+            if job is not None:
+                self._process(job)
+
+    def _process(self, job: dict):
+        job_id = job["id"]
+        start = time.perf_counter()
+        try:
+            with open(job["file_path"], "rb") as f:
+                file_bytes = f.read()
+            record = process_document(job["file_name"], file_bytes, sha256_hex(file_bytes), self.stages, job["language"])
+            self.queue.complete(job_id, {
+                "extracted": record["extracted"],
+                "validation": record["validation"],
+                "timings": record["timings"],
+            })
+            logger.info("Job completed (job_id=%s, time=%.2fs)", job_id, time.perf_counter() - start)
+        except Exception as e:
+            logger.exception("Job failed (job_id=%s)", job_id)
+            self.queue.fail(job_id, str(e))
+
+        if job["webhook_url"]:
+            self.webhooks.submit(job["webhook_url"], self.queue.get(job_id))
+
+
+# ------------------ Application Lifespan ------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the job queue, recover interrupted jobs and start the workers."""
+    setup_logging()
+    app.state.queue = JobQueue(JOBS_DB_PATH, JOBS_SPOOL_DIR)
+    app.state.queue.requeue_running()
+
+    stages = {
+        "ocr": Stage("ocr", EXTRACTION_WORKERS, SERVICE_OCR_RPM),
+        "llm": Stage("llm", EXTRACTION_WORKERS, SERVICE_LLM_RPM),
+    }
+    app.state.webhooks = WebhookDispatcher(WEBHOOK_WORKERS)
+    app.state.webhooks.start()
+    app.state.workers = WorkerPool(app.state.queue, EXTRACTION_WORKERS, stages, app.state.webhooks)
+    app.state.workers.start()
+    logger.info("Extraction service started (jobs=%s)", app.state.queue.stats())
+    yield
+    app.state.workers.stop()
+    app.state.webhooks.stop()
+    close_clients()
+    logger.info("Extraction service stopped")
+
+
+app = FastAPI(title="Form 283 Extraction Service", lifespan=lifespan)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request, file_name: str = "upload", language: str = "english", webhook_url: str = None):
+    """Queue a form (raw PDF / JPG / PNG request body) and return its job id."""
+    language = language.lower()
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"language must be one of {SUPPORTED_LANGUAGES}")
+
+    file_bytes = await request.body()
+    if not file_bytes:
+        raise HTTPException(status_code=400, detail="Request body must contain the form file")
+    if len(file_bytes) > MAX_UPLOAD_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_MB} MB")
+
+    job_id = await asyncio.to_thread(request.app.state.queue.enqueue, file_name, file_bytes, language, webhook_url)
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """Job status; includes `result` once done or `error` if it failed."""
+    job = await asyncio.to_thread(request.app.state.queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job
+
+
+@app.get("/health")
+async def health(request: Request):
+    jobs = await asyncio.to_thread(request.app.state.queue.stats)
+    return {"status": "ok", "workers": request.app.state.workers.workers, "jobs": jobs}
+
+
+# ------------------ Local Development Entrypoint ------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("extraction_service:app", host="127.0.0.1", port=8001, log_level="info")
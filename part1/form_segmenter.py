@@ -0,0 +1,143 @@
+import os
+import re
+import logging
+from collections import namedtuple
+from functools import lru_cache
+
+from ocr import extract_pages_from_document, OCR_OUTPUT_MODE
+from ocr_layout import FORM_TEMPLATE_PATH, _tokens
+from text_layer import read_text_layers, is_usable_text_layer, _page_subset
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+# A page without a page marker starts a new form when at least this share of the
+# template's first-page anchor lines is found on it (first pages score ~0.98,
+# second pages ~0.09 on the sample forms)
+SEGMENT_ANCHOR_MIN_SCORE = float(os.getenv("SEGMENT_ANCHOR_MIN_SCORE", "0.5"))
+# Forms of one bundle extracted concurrently
+SEGMENT_WORKERS = int(os.getenv("SEGMENT_WORKERS", "8"))
+
+# "עמוד1 מתוך2" / "Page 1 of 2" in the form header
+_PAGE_MARKER_RE = re.compile(r"(?:עמוד|Page)\s*(\d{1,2})\s*(?:מתוך|of)\s*(\d{1,2})", re.IGNORECASE)
+
+# One form of a bundle: pages [start, end) (0-based) and, when the segmentation OCR
+# already produced it, the form's "text" mode OCR text (None = run OCR on the segment)
+FormSegment = namedtuple("FormSegment", ["start", "end", "text"])
+
+
+@lru_cache(maxsize=None)
+def load_form_anchors(template_path: str = FORM_TEMPLATE_PATH) -> tuple:
+    """
+    Token tuples of the blank form's first-page lines that appear on no later page
+    (section titles, first-page labels); empty if the template cannot be read.
+    """
+    try:
+        from pypdf import PdfReader
+
+        pages = [page.extract_text() or "" for page in PdfReader(template_path).pages]
+    except Exception:
+        logger.exception("Failed loading form anchors from %s", template_path)
+        return ()
+
+    def lines(text):
+        return [tuple(_tokens(line)) for line in text.splitlines() if _tokens(line)]
+
+    later = {line for text in pages[1:] for line in lines(text)}
+    anchors = tuple(dict.fromkeys(
+        line for line in lines(pages[0]) if line not in later and not any(t.isdigit() for t in line)
+    ))
+    logger.info("Form anchors loaded (anchors=%d)", len(anchors))
+    return anchors
+
+
+def page_marker(text: str):
+    """(page number, page total) from the page header marker, or None."""
+    match = _PAGE_MARKER_RE.search(text)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def anchor_score(text: str, anchors: tuple) -> float:
+    """Share of `anchors` whose words all appear on the page."""
+    if not anchors:
+        return 0.0
+    tokens = set(_tokens(text))
+    return sum(1 for anchor in anchors if all(t in tokens for t in anchor)) / len(anchors)
+
+
+def is_form_start(text: str, anchors: tuple) -> bool:
+    """The page marker decides when it was read; otherwise the first-page anchors do."""
+    marker = page_marker(text)
+    if marker is not None:
+        return marker[0] == 1
+    return anchor_score(text, anchors) >= SEGMENT_ANCHOR_MIN_SCORE
+
+
+def find_form_boundaries(page_texts: list, anchors: tuple = None) -> list:
+    """Split pages into forms: [(start, end), ...] with `end` exclusive, covering every page."""
+    if anchors is None:
+        anchors = load_form_anchors()
+    starts = [0] + [index for index in range(1, len(page_texts)) if is_form_start(page_texts[index], anchors)]
+    return list(zip(starts, starts[1:] + [len(page_texts)]))
+
+
+def _page_texts(file_bytes: bytes, endpoint: str, key: str) -> tuple:
+    """
+    Page texts for boundary detection and whether each came from OCR: usable embedded
+    text layers are read locally (the headers do not need checkbox marks), contiguous
+    runs of the remaining pages go through layout OCR.
+    """
+    layers = read_text_layers(file_bytes)
+    usable = [is_usable_text_layer(text) for text in layers]
+    texts, from_ocr = [], []
+    page_index = 0
+    while page_index < len(layers):
+        if usable[page_index]:
+            texts.append(layers[page_index])
+            from_ocr.append(False)
+            page_index += 1
+            continue
+
+        run_start = page_index
+        while page_index < len(layers) and not usable[page_index]:
+            page_index += 1
+        pages = list(range(run_start, page_index))
+        subset = file_bytes if len(pages) == len(layers) else _page_subset(file_bytes, pages)
+        texts.extend(extract_pages_from_document(subset, endpoint, key))
+        from_ocr.extend([True] * len(pages))
+    return texts, from_ocr
+
+
+def segment_document(file_bytes: bytes, endpoint: str, key: str, mode: str = None) -> list:
+    """
+    Detect the Form 283 submissions in a (possibly multi-form) PDF. Returns one
+    FormSegment per form; images and single-page PDFs are a single segment.
+    Segments read entirely by the segmentation OCR carry their text when `mode`
+    is "text", so those pages are not sent to OCR twice.
+    """
+    mode = mode or OCR_OUTPUT_MODE
+    page_texts, from_ocr = _page_texts(file_bytes, endpoint, key) if file_bytes.startswith(b"%PDF") else ([], [])
+    if len(page_texts) <= 1:
+        text = page_texts[0] if mode == "text" and any(from_ocr) else None
+        return [FormSegment(0, len(page_texts), text)]
+
+    segments = []
+    for start, end in find_form_boundaries(page_texts):
+        text = None
+        if mode == "text" and all(from_ocr[start:end]):
+            text = "\n".join(page for page in page_texts[start:end] if page)
+        segments.append(FormSegment(start, end, text))
+
+    logger.info(
+        "Form segmentation completed (pages=%d, forms=%d, ocr_pages=%d)",
+        len(page_texts), len(segments), sum(from_ocr)
+    )
+    return segments
+
+
+def segment_bytes(file_bytes: bytes, segment: FormSegment, page_count: int) -> bytes:
+    """The segment's pages as their own PDF (the original bytes when it spans the document)."""
+    if segment.start == 0 and segment.end >= page_count:
+        return file_bytes
+    return _page_subset(file_bytes, list(range(segment.start, segment.end)))
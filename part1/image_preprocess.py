@@ -0,0 +1,66 @@
+import os
+import logging
+from io import BytesIO
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+# Optional pre-processing of photos / scans before they are uploaded for OCR
+IMAGE_PREPROCESS = os.getenv("IMAGE_PREPROCESS", "0") == "1"
+# Resolution the OCR model needs; larger images are downscaled to it, assuming the
+# photo shows one A4 page (long side 11.69 inches)
+IMAGE_TARGET_DPI = int(os.getenv("IMAGE_TARGET_DPI", "200"))
+IMAGE_PAGE_LONG_SIDE_INCHES = 11.69
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+# Bump when the pre-processing changes, to invalidate cached OCR output
+IMAGE_PREPROCESS_VERSION = "1"
+
+
+def is_image(file_bytes: bytes) -> bool:
+    return file_bytes.startswith((b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n"))
+
+
+def preprocess_image(file_bytes: bytes) -> bytes:
+    """
+    Prepare a JPG/PNG for OCR: apply the EXIF orientation, downscale to
+    IMAGE_TARGET_DPI, convert to grayscale and recompress as JPEG.
+    PDFs, unreadable images and results that would not be smaller are returned unchanged.
+    """
+    if not is_image(file_bytes):
+        return file_bytes
+
+    try:
+        from PIL import Image, ImageOps
+
+        with Image.open(BytesIO(file_bytes)) as image:
+            original_size = image.size
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("L")
+
+            max_side = int(IMAGE_TARGET_DPI * IMAGE_PAGE_LONG_SIDE_INCHES)
+            if max(image.size) > max_side:
+                scale = max_side / max(image.size)
+                image = image.resize(
+                    (round(image.width * scale), round(image.height * scale)),
+                    Image.Resampling.LANCZOS
+                )
+
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+            processed = buffer.getvalue()
+            processed_size = image.size
+
+    except Exception:
+        logger.exception("Image pre-processing failed, uploading the original image")
+        return file_bytes
+
+    if len(processed) >= len(file_bytes):
+        logger.info("Image pre-processing skipped, output not smaller (bytes=%d)", len(file_bytes))
+        return file_bytes
+
+    logger.info(
+        "Image pre-processing completed (size=%dx%d->%dx%d, bytes=%d->%d)",
+        *original_size, *processed_size, len(file_bytes), len(processed)
+    )
+    return processed
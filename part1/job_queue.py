@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    language TEXT NOT NULL,
+    webhook_url TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobQueue:
+    """
+    Persistent FIFO queue of extraction jobs in SQLite.
+
+    Uploaded files are spooled to `spool_dir` and only their path is stored,
+    so submissions stay a file write plus one INSERT. Workers take jobs with
+    claim(); jobs left "running" by a crashed process are re-queued on startup.
+    """
+
+    def __init__(self, db_path: str, spool_dir: str):
+        self.db_path = db_path
+        self.spool_dir = spool_dir
+        self._available = threading.Condition()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        os.makedirs(spool_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation: safe across worker threads
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, file_name: str, file_bytes: bytes, language: str, webhook_url: str = None) -> str:
+        """Spool the file, queue the job and wake a worker. Returns the job id."""
+        job_id = uuid.uuid4().hex
+        file_path = os.path.join(self.spool_dir, job_id)
+        with open(file_path, "wb") as f:
+            f.write(file_bytes)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, file_name, file_path, language, webhook_url, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, file_name, file_path, language, webhook_url, time.time())
+            )
+
+        with self._available:
+            self._available.notify()
+        logger.info("Job queued (job_id=%s, file=%s, bytes=%d)", job_id, file_name, len(file_bytes))
+        return job_id
+
+    def claim(self, timeout: float = 1.0):
+        """
+        Atomically move the oldest queued job to "running" and return it as a dict,
+        waiting up to `timeout` seconds for one; None when the queue stays empty.
+        """
+        job = self._claim_next()
+        if job is None:
+            with self._available:
+                self._available.wait(timeout)
+            job = self._claim_next()
+        return job
+
+    def _claim_next(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (time.time(), row["id"])
+            )
+            conn.execute("COMMIT")
+        return dict(row)
+
+    def complete(self, job_id: str, result: dict):
+        self._finish(job_id, "done", result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, "error", error=error)
+
+    def _finish(self, job_id: str, status: str, result: str = None, error: str = None):
+        with self._connect() as conn:
+            row = conn.execute("SELECT file_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+        if row is not None:
+            try:
+                os.remove(row["file_path"])
+            except OSError:
+                logger.warning("Failed removing spooled file of job %s", job_id)
+
+    def get(self, job_id: str):
+        """Public view of a job (None if unknown)."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "file_name": row["file_name"],
+            "language": row["language"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def requeue_running(self) -> int:
+        """Put jobs interrupted by a shutdown / crash back in the queue."""
+        with self._connect() as conn:
+            count = conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            ).rowcount
+        if count:
+            logger.warning("Re-queued %d interrupted jobs", count)
+        return count
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
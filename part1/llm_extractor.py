@@ -1,102 +1,241 @@
-import logging
+import os
 import json
-import re
+import time
+import logging
+from functools import lru_cache
 
-from openai import AzureOpenAI
+import tracing
 from schema import InjuryForm
+from validation import validate_extraction, check_field_formats
+from rule_extractor import pre_extract_fields, RULE_PREEXTRACTION
+from streaming_json import StreamingJSONParser
+from azure_clients import get_openai_client
 
 # IMPORTANT:
 # Logging is configured centrally in logging_config.py
 logger = logging.getLogger(__name__)
 
+# Bump when the extraction prompt or parsing changes, to invalidate cached LLM output
+EXTRACTOR_VERSION = "3"
 
-def safe_json_loads(raw_text: str) -> dict:
-    """
-    Safely extract and parse a JSON object from raw LLM output.
-    """
-    try:
-        match = re.search(r'\{.*\}', raw_text, flags=re.DOTALL)
-        if not match:
-            raise ValueError("No JSON object found in LLM response")
+# "json_schema" enforces the InjuryForm schema (structured outputs, API version 2024-08-01-preview+);
+# "json_object" only guarantees syntactically valid JSON, for older API versions.
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "json_schema")
 
-        json_str = match.group(0)
-        json_str = json_str.replace("'", '"')
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
 
-        parsed = json.loads(json_str)
-        logger.debug("LLM JSON parsed successfully")
-        return parsed
-
-    except Exception:
-        logger.exception("Failed to parse JSON from LLM output")
-        raise
+def _strict_schema(node):
+    """
+    Make a pydantic JSON schema acceptable for strict structured outputs:
+    every property required, no additional properties, no default/title keywords.
+    """
+    if isinstance(node, dict):
+        node = {k: _strict_schema(v) for k, v in node.items() if k not in ("default", "title")}
+        if node.get("type") == "object" and "properties" in node:
+            node["required"] = list(node["properties"])
+            node["additionalProperties"] = False
+        return node
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    return node
+
+
+@lru_cache(maxsize=None)
+def get_response_format(mode: str = EXTRACTION_MODE, exclude: frozenset = frozenset()) -> dict:
+    """
+    response_format argument for the chat completion, derived once from InjuryForm
+    (per set of top-level fields already filled by pre-extraction).
+    """
+    if mode == "json_object":
+        return {"type": "json_object"}
+
+    schema = InjuryForm.model_json_schema()
+    schema["properties"] = {k: v for k, v in schema["properties"].items() if k not in exclude}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "InjuryForm",
+            "strict": True,
+            "schema": _strict_schema(schema)
+        }
+    }
+
+
+@lru_cache(maxsize=None)
+def get_system_prompt(exclude: frozenset = frozenset()) -> str:
+    """System prompt with a compact (no whitespace) InjuryForm skeleton, built once per excluded field set."""
+    skeleton = {k: v for k, v in InjuryForm().model_dump().items() if k not in exclude}
+    schema_json = json.dumps(skeleton, ensure_ascii=False, separators=(",", ":"))
+    logger.info("Extraction system prompt prepared (schema_chars=%d, excluded=%d)", len(schema_json), len(exclude))
+    return (
+        "You are an expert at extracting structured data from Israeli National Insurance forms.\n"
+        "Forms may be in Hebrew or English.\n"
+        "Return a JSON object with exactly these fields; use an empty string for missing or unclear fields:\n"
+        f"{schema_json}"
+    )
+
+
+def merge_prefilled(extracted: dict, prefilled: dict) -> dict:
+    """Overlay rule-based values on the LLM output (nested dicts merged key by key)."""
+    merged = dict(extracted)
+    for key, value in prefilled.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def _stream_completion(client, request: dict, on_partial, prefilled: dict) -> tuple:
+    """
+    Stream the chat completion, calling on_partial with the fields parsed so far
+    (merged with `prefilled`) whenever they change. Returns (content, refusal, usage).
+    """
+    parser = StreamingJSONParser()
+    refusal = ""
+    usage = None
+    start = time.perf_counter()
+    first_field_logged = False
+
+    stream = client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+    for chunk in stream:
+        usage = chunk.usage or usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if getattr(delta, "refusal", None):
+            refusal += delta.refusal
+        if not delta.content:
+            continue
+        partial = parser.feed(delta.content)
+        if partial is None or not isinstance(partial, dict):
+            continue
+        if not first_field_logged:
+            logger.info("LLM stream first field received (latency=%.2fs)", time.perf_counter() - start)
+            first_field_logged = True
+        on_partial(merge_prefilled(partial, prefilled))
+
+    return parser.text, refusal, usage
 
 
 def extract_fields_with_llm(
     ocr_text: str,
     endpoint: str,
     api_key: str,
-    deployment: str
+    deployment: str,
+    prefilled: dict = None,
+    on_partial=None
 ) -> dict:
     """
     Extract structured fields from OCR text using Azure OpenAI.
+
+    The completion is constrained to the InjuryForm schema and parsed directly
+    into it. Top-level fields in `prefilled` (rule-based values) are left out of
+    the prompt and merged into the result. With `on_partial`, the completion is
+    streamed and the callback receives the partial fields as they arrive.
+    Raises RuntimeError when the LLM call or parsing fails.
     """
     try:
-        schema_json = InjuryForm().model_dump_json(
-            indent=2,
-            ensure_ascii=False
-        )
-        logger.info("Schema JSON prepared for LLM extraction")
-
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=api_key,
-            api_version="2024-02-15-preview"
-        )
-        logger.info("AzureOpenAI client initialized")
-
-        system_prompt = f"""
-You are an expert at extracting structured data from Israeli National Insurance forms.
-Forms may be in Hebrew or English.
-Return ONLY valid JSON matching the provided schema.
-For missing or unclear fields, return an empty string.
-Do not add extra fields.
+        client = get_openai_client(endpoint, api_key)
+        prefilled = prefilled or {}
+        # Nested groups (address) stay in the prompt; their prefilled keys override the LLM
+        exclude = frozenset(k for k, v in prefilled.items() if k in InjuryForm.model_fields and k != "address")
 
-Here is the JSON schema you must follow exactly:
-{schema_json}
-"""
+        user_prompt = f"OCR TEXT:\n{ocr_text}"
 
-        user_prompt = f"""
-Extract the following OCR text into the JSON schema above.
+        logger.info("Sending request to LLM (mode=%s, streaming=%s)", EXTRACTION_MODE, on_partial is not None)
 
-OCR TEXT:
-{ocr_text}
-
-Return JSON only.
-"""
-
-        logger.info("Sending request to LLM")
-
-        response = client.chat.completions.create(
-            model=deployment,
-            messages=[
-                {"role": "system", "content": system_prompt},
+        request = {
+            "model": deployment,
+            "messages": [
+                {"role": "system", "content": get_system_prompt(exclude)},
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=0
+            "temperature": 0,
+            "response_format": get_response_format(EXTRACTION_MODE, exclude)
+        }
+
+        if on_partial is not None:
+            raw_json, refusal, usage = _stream_completion(client, request, on_partial, prefilled)
+        else:
+            response = client.chat.completions.create(**request)
+            message = response.choices[0].message
+            raw_json, refusal, usage = message.content or "", getattr(message, "refusal", None), response.usage
+
+        if refusal:
+            raise ValueError(f"LLM refused the extraction: {refusal}")
+
+        logger.info(
+            "LLM response received (deployment=%s, length=%d, prompt_tokens=%s, completion_tokens=%s)",
+            deployment, len(raw_json),
+            getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+        )
+        tracing.add(
+            llm_calls=1, prompt_chars=len(user_prompt),
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None)
         )
 
-        raw_json = response.choices[0].message.content
-        logger.info("LLM response received (length=%d)", len(raw_json))
-
-        parsed_json = safe_json_loads(raw_json)
-
-        validated_output = InjuryForm(**parsed_json).model_dump()
+        validated_output = InjuryForm.model_validate_json(raw_json).model_dump()
+        if prefilled:
+            validated_output = InjuryForm.model_validate(merge_prefilled(validated_output, prefilled)).model_dump()
         logger.info("LLM output validated against InjuryForm schema")
 
         return validated_output
 
     except Exception:
         logger.exception("LLM field extraction failed")
-        # Safe fallback: return empty schema
-        return InjuryForm().model_dump()
+        raise RuntimeError("LLM field extraction failed")
+
+
+def extraction_quality_issues(data: dict, min_completeness: float, max_format_errors: int) -> list:
+    """Reasons an extraction is not good enough to accept from a cheaper model (empty = accept)."""
+    issues = []
+    validation = validate_extraction(data)
+    if validation["missing_required_fields"]:
+        issues.append(f"missing={','.join(validation['missing_required_fields'])}")
+    if validation["completeness_score_percent"] < min_completeness:
+        issues.append(f"completeness={validation['completeness_score_percent']:.2f}")
+    invalid = check_field_formats(data)
+    if len(invalid) > max_format_errors:
+        issues.append(f"invalid_format={','.join(invalid)}")
+    return issues
+
+
+def extract_fields_cascading(
+    ocr_text: str,
+    endpoint: str,
+    api_key: str,
+    tiers: list,
+    min_completeness: float,
+    max_format_errors: int,
+    on_partial=None
+) -> dict:
+    """
+    Extract fields with the cheapest deployment in `tiers` first, escalating to the
+    next one only when the result fails extraction_quality_issues. The last tier's
+    result is returned as is. Raises RuntimeError when the last tier fails.
+    Mechanically-parsable fields are pre-extracted with rules once, for all tiers;
+    `on_partial` streams each tier's fields as they arrive (see extract_fields_with_llm).
+    """
+    prefilled = pre_extract_fields(ocr_text) if RULE_PREEXTRACTION else {}
+
+    for tier_index, deployment in enumerate(tiers):
+        last_tier = tier_index == len(tiers) - 1
+        start = time.perf_counter()
+        try:
+            extracted = extract_fields_with_llm(ocr_text, endpoint, api_key, deployment, prefilled, on_partial)
+        except RuntimeError:
+            if last_tier:
+                raise
+            issues = ["extraction_failed"]
+        else:
+            issues = [] if last_tier else extraction_quality_issues(extracted, min_completeness, max_format_errors)
+        latency = time.perf_counter() - start
+
+        decision = "accept" if not issues else "escalate"
+        logger.info(
+            "Extraction routing (tier=%d, deployment=%s, latency=%.2fs, decision=%s, issues=%s)",
+            tier_index + 1, deployment, latency, decision, ";".join(issues) or "-"
+        )
+        if not issues:
+            return extracted
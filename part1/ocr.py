@@ -1,56 +1,61 @@
+import os
 import logging
+import tempfile
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
 from azure.core.exceptions import AzureError
 
+import tracing
+from azure_clients import get_document_client
+from ocr_layout import serialize_compact
+
 # IMPORTANT:
 # Logging is configured centrally in logging_config.py
 logger = logging.getLogger(__name__)
 
+OCR_MODEL = "prebuilt-layout"
+# Bump when the text produced from the OCR result changes, to invalidate cached OCR output
+OCR_VERSION = "1"
+
+# "text": every OCR line joined by newlines.
+# "compact": key/value pairs, selection marks and table cells, with static form boilerplate dropped.
+OCR_OUTPUT_MODE = os.getenv("OCR_OUTPUT_MODE", "text")
+# prebuilt-document adds key/value pairs on top of the layout result
+OCR_MODELS = {"text": OCR_MODEL, "compact": "prebuilt-document"}
+
+# Page-parallel OCR: PDFs longer than OCR_PAGES_PER_REQUEST pages are split into page
+# ranges analyzed concurrently by up to OCR_PAGE_WORKERS requests (1 = single request)
+OCR_PAGE_WORKERS = int(os.getenv("OCR_PAGE_WORKERS", "1"))
+OCR_PAGES_PER_REQUEST = int(os.getenv("OCR_PAGES_PER_REQUEST", "2"))
+
 
-def extract_text_from_document(file_bytes, endpoint, key) -> str:
+def extract_text_from_document(file_bytes, endpoint, key, mode: str = None, page_offset: int = 0) -> str:
     """
-    Extract text from a PDF or image using Azure Form Recognizer prebuilt-layout model.
+    Extract text from a PDF or image using Azure Form Recognizer.
     :param file_bytes: bytes of the uploaded document
     :param endpoint: Azure Form Recognizer endpoint
     :param key: Azure Form Recognizer API key
+    :param mode: "text" or "compact" (defaults to OCR_OUTPUT_MODE)
+    :param page_offset: pages preceding this document when it is part of a larger PDF
     :return: extracted text as a single string
     """
+    mode = mode or OCR_OUTPUT_MODE
     try:
         if not file_bytes:
             raise ValueError("No file bytes provided for OCR extraction")
 
-        logger.info("Initializing Azure Form Recognizer client")
+        client = get_document_client(endpoint, key)
+        model = OCR_MODELS[mode]
 
-        client = DocumentAnalysisClient(
-            endpoint=endpoint,
-            credential=AzureKeyCredential(key)
-        )
-
-        logger.info("Starting document analysis (prebuilt-layout)")
-        poller = client.begin_analyze_document(
-            "prebuilt-layout",
-            file_bytes
-        )
+        page_count = _pdf_page_count(file_bytes) if OCR_PAGE_WORKERS > 1 else 0
+        if page_count > OCR_PAGES_PER_REQUEST:
+            texts = _analyze_page_ranges(client, model, mode, file_bytes, page_count, page_offset)
+            extracted_text = "\n".join(text for text in texts if text)
+        else:
+            logger.info("Starting document analysis (%s, mode=%s)", model, mode)
+            extracted_text = _analyze(client, model, mode, file_bytes, page_offset)
 
-        result = poller.result()
-        logger.info(
-            "Document analysis completed (pages=%d)",
-            len(result.pages)
-        )
-
-        text_blocks = []
-        for page_index, page in enumerate(result.pages, start=1):
-            logger.debug(
-                "Processing page %d (lines=%d)",
-                page_index,
-                len(page.lines)
-            )
-            for line in page.lines:
-                text_blocks.append(line.content)
-
-        extracted_text = "\n".join(text_blocks)
         logger.info(
             "Text extraction completed (characters=%d)",
             len(extracted_text)
@@ -65,3 +70,148 @@ def extract_text_from_document(file_bytes, endpoint, key) -> str:
     except Exception:
         logger.exception("OCR extraction failed")
         raise RuntimeError("OCR extraction failed")
+
+
+def extract_pages_from_document(file_bytes, endpoint, key) -> list:
+    """
+    Layout OCR of a PDF or image, one string of OCR lines per page (the per-page
+    split of the "text" mode output). Page-parallel like extract_text_from_document.
+    """
+    try:
+        if not file_bytes:
+            raise ValueError("No file bytes provided for OCR extraction")
+
+        client = get_document_client(endpoint, key)
+
+        page_count = _pdf_page_count(file_bytes) if OCR_PAGE_WORKERS > 1 else 0
+        if page_count > OCR_PAGES_PER_REQUEST:
+            ranges = _analyze_page_ranges(
+                client, OCR_MODEL, "text", file_bytes, page_count,
+                render=lambda result, offset: _result_to_pages(result)
+            )
+            pages = [page for range_pages in ranges for page in range_pages]
+        else:
+            logger.info("Starting document analysis (%s, mode=pages)", OCR_MODEL)
+            pages = _result_to_pages(_analyze_result(client, OCR_MODEL, file_bytes))
+
+        logger.info("Page text extraction completed (pages=%d)", len(pages))
+        return pages
+
+    except AzureError:
+        logger.exception("Azure Form Recognizer API error")
+        raise RuntimeError("Azure Form Recognizer API error")
+
+    except Exception:
+        logger.exception("OCR extraction failed")
+        raise RuntimeError("OCR extraction failed")
+
+
+def _result_to_text(result, mode: str, page_offset: int = 0) -> str:
+    """Render an analyze result as plain OCR lines or as compact text."""
+    if mode == "compact":
+        return serialize_compact(result, page_offset=page_offset)
+
+    text_blocks = []
+    for page_index, page in enumerate(result.pages, start=page_offset + 1):
+        logger.debug(
+            "Processing page %d (lines=%d)",
+            page_index,
+            len(page.lines)
+        )
+        for line in page.lines:
+            text_blocks.append(line.content)
+
+    return "\n".join(text_blocks)
+
+
+def _result_to_pages(result) -> list:
+    """OCR lines of every page, one string per page."""
+    return ["\n".join(line.content for line in page.lines) for page in result.pages]
+
+
+def _analyze_result(client, model: str, document):
+    """Run one analyze operation on `document` (bytes or a binary file object)."""
+    poller = client.begin_analyze_document(
+        model,
+        document
+    )
+
+    result = poller.result()
+    logger.info(
+        "Document analysis completed (pages=%d)",
+        len(result.pages)
+    )
+    tracing.add(ocr_requests=1, bytes_uploaded=_document_size(document), ocr_pages=len(result.pages))
+    return result
+
+
+def _document_size(document) -> int:
+    if isinstance(document, (bytes, bytearray)):
+        return len(document)
+    return os.fstat(document.fileno()).st_size
+
+
+def _analyze(client, model: str, mode: str, document, page_offset: int = 0) -> str:
+    return _result_to_text(_analyze_result(client, model, document), mode, page_offset)
+
+
+def _pdf_page_count(file_bytes: bytes) -> int:
+    """Number of pages for a PDF, 0 for images or unreadable PDFs."""
+    if not file_bytes.startswith(b"%PDF"):
+        return 0
+    try:
+        from pypdf import PdfReader
+
+        return len(PdfReader(BytesIO(file_bytes)).pages)
+    except Exception:
+        logger.warning("Could not read PDF page count, analyzing as a single document")
+        return 0
+
+
+def _analyze_page_ranges(client, model: str, mode: str, file_bytes: bytes, page_count: int,
+                         page_offset: int = 0, render=None) -> list:
+    """
+    Split the PDF into OCR_PAGES_PER_REQUEST-page temp files, analyze them with
+    up to OCR_PAGE_WORKERS concurrent requests and return each range's output in
+    page order. `render(result, page_offset)` converts a result (default: text in `mode`).
+    """
+    if render is None:
+        def render(result, offset):
+            return _result_to_text(result, mode, offset)
+
+    from pypdf import PdfReader, PdfWriter
+
+    ranges = [
+        (start, min(start + OCR_PAGES_PER_REQUEST, page_count))
+        for start in range(0, page_count, OCR_PAGES_PER_REQUEST)
+    ]
+    workers = min(OCR_PAGE_WORKERS, len(ranges))
+    logger.info(
+        "Starting page-parallel document analysis (%s, mode=%s, pages=%d, requests=%d, workers=%d)",
+        model, mode, page_count, len(ranges), workers
+    )
+
+    with tempfile.TemporaryDirectory(prefix="ocr_pages_") as temp_dir:
+        reader = PdfReader(BytesIO(file_bytes))
+        paths = []
+        for start, end in ranges:
+            writer = PdfWriter()
+            for page_index in range(start, end):
+                writer.add_page(reader.pages[page_index])
+            path = os.path.join(temp_dir, f"pages_{start + 1:04d}_{end:04d}.pdf")
+            with open(path, "wb") as f:
+                writer.write(f)
+            paths.append(path)
+
+        def analyze_range(path: str, start: int):
+            # Stream the page range from disk rather than holding another copy in memory
+            with open(path, "rb") as document:
+                return render(_analyze_result(client, model, document), page_offset + start)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(tracing.run_in_context(analyze_range), path, start)
+                for path, (start, _) in zip(paths, ranges)
+            ]
+            # Collect in submission order so the output follows page order
+            return [future.result() for future in futures]
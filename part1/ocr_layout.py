@@ -0,0 +1,140 @@
+import os
+import re
+import logging
+from functools import lru_cache
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+# Blank Form 283 - its text defines the static boilerplate dropped from compact OCR output
+FORM_TEMPLATE_PATH = os.getenv(
+    "FORM_TEMPLATE_PATH",
+    os.path.join(os.path.dirname(__file__), "phase1_data", "283_raw.pdf")
+)
+
+# Lines shorter than this are kept even if they match the template: short labels
+# ("שם פרטי", "זכר") carry field context the LLM still needs
+BOILERPLATE_MIN_TOKENS = 4
+BOILERPLATE_MIN_OVERLAP = 0.9
+
+_TOKEN_RE = re.compile(r"[A-Za-zא-ת]+|\d+")
+_SELECTED = ":selected:"
+_UNSELECTED = ":unselected:"
+
+
+def _tokens(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+@lru_cache(maxsize=None)
+def load_template_vocabulary(template_path: str = FORM_TEMPLATE_PATH) -> frozenset:
+    """Word set of the blank form's text layer (empty if it cannot be read)."""
+    try:
+        from pypdf import PdfReader
+
+        reader = PdfReader(template_path)
+        text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        vocabulary = frozenset(t for t in _tokens(text) if not t.isdigit())
+        logger.info("Form template vocabulary loaded (words=%d)", len(vocabulary))
+        return vocabulary
+    except Exception:
+        logger.exception("Failed loading form template vocabulary from %s", template_path)
+        return frozenset()
+
+
+def is_boilerplate(line: str, vocabulary: frozenset) -> bool:
+    """True for long lines made (almost) entirely of the blank form's own words."""
+    tokens = _tokens(line)
+    if len(tokens) < BOILERPLATE_MIN_TOKENS or any(t.isdigit() for t in tokens):
+        return False
+    known = sum(1 for t in tokens if t in vocabulary)
+    return known / len(tokens) >= BOILERPLATE_MIN_OVERLAP
+
+
+def _marks(text: str) -> str:
+    """Render selection-mark placeholders as compact checkbox symbols."""
+    return " ".join(text.replace(_SELECTED, "[x]").replace(_UNSELECTED, "[ ]").split())
+
+
+def _span_ranges(elements) -> list:
+    ranges = []
+    for element in elements:
+        for span in getattr(element, "spans", None) or []:
+            ranges.append((span.offset, span.offset + span.length))
+    return ranges
+
+
+def _covered(spans, ranges: list) -> bool:
+    """True when every span lies inside one of `ranges`."""
+    if not spans:
+        return False
+    return all(any(start <= s.offset and s.offset + s.length <= end for start, end in ranges) for s in spans)
+
+
+def serialize_compact(result, vocabulary: frozenset = None, page_offset: int = 0) -> str:
+    """
+    Compact text for an analyze result (prebuilt-document / prebuilt-layout):
+
+    - key/value pairs as "key: value" (pairs with empty values dropped)
+    - tables as pipe-separated rows
+    - remaining lines, minus static form boilerplate, per page
+    - selection marks as [x] / [ ]
+
+    `page_offset` shifts page numbers when `result` covers a page range of a larger PDF.
+    """
+    if vocabulary is None:
+        vocabulary = load_template_vocabulary()
+
+    sections = []
+    covered_ranges = []
+
+    fields = []
+    for pair in getattr(result, "key_value_pairs", None) or []:
+        if pair.key is None:
+            continue
+        value = _marks(pair.value.content) if pair.value is not None else ""
+        if not value:
+            continue
+        fields.append(f"{_marks(pair.key.content).rstrip(':')}: {value}")
+        covered_ranges.extend(_span_ranges([pair.key, pair.value]))
+    if fields:
+        sections.append("## Fields\n" + "\n".join(fields))
+
+    tables = []
+    for table_index, table in enumerate(getattr(result, "tables", None) or [], start=1):
+        rows = {}
+        for cell in table.cells:
+            rows.setdefault(cell.row_index, {})[cell.column_index] = _marks(cell.content)
+        lines = [
+            " | ".join(row[col] for col in sorted(row))
+            for _, row in sorted(rows.items())
+            if any(row.values())
+        ]
+        if lines:
+            tables.append(f"# Table {table_index}\n" + "\n".join(lines))
+        covered_ranges.extend(_span_ranges([table]))
+    if tables:
+        sections.append("## Tables\n" + "\n".join(tables))
+
+    dropped = 0
+    for page in result.pages:
+        lines = []
+        for line in page.lines or []:
+            if _covered(line.spans, covered_ranges):
+                continue
+            if is_boilerplate(line.content, vocabulary):
+                dropped += 1
+                continue
+            text = _marks(line.content)
+            if text:
+                lines.append(text)
+        if lines:
+            sections.append(f"## Page {page.page_number + page_offset}\n" + "\n".join(lines))
+
+    compact = "\n".join(sections)
+    logger.info(
+        "Compact OCR serialization (fields=%d, tables=%d, boilerplate_lines_dropped=%d, characters=%d)",
+        len(fields), len(tables), dropped, len(compact)
+    )
+    return compact
@@ -1,12 +1,20 @@
 import time
 import shutil
 import streamlit as st
+import tracing
 from logging_config import setup_logging
-from ocr import extract_text_from_document
-from llm_extractor import extract_fields_with_llm
+from ocr import OCR_MODELS, OCR_OUTPUT_MODE, OCR_VERSION
+from text_layer import extract_text, TEXT_LAYER_FAST_PATH, TEXT_LAYER_VERSION
+from image_preprocess import IMAGE_PREPROCESS, IMAGE_PREPROCESS_VERSION, IMAGE_TARGET_DPI, IMAGE_JPEG_QUALITY
+from llm_extractor import extract_fields_cascading, EXTRACTOR_VERSION
+from rule_extractor import RULE_PREEXTRACTION
 from validation import validate_extraction
 from part1_config import *
 from form_translator import translate_form
+from pipeline_cache import PipelineCache, sha256_hex
+
+# Minimum seconds between progressive re-renders of streamed extraction fields
+PARTIAL_RENDER_INTERVAL = 0.15
 
 
 # ------------------ Helper Functions ------------------
@@ -53,42 +61,100 @@ def setup_debug(enable=False, host="localhost", port=5678, suspend=False):
             logger.exception("Failed to attach PyCharm debugger")
 
 
-def run_ocr(file_bytes: bytes) -> str:
-    """Run OCR extraction and log results."""
-    with st.spinner("Running OCR..."):
+@st.cache_resource
+def get_pipeline_cache() -> PipelineCache:
+    """Process-wide stage cache, shared across Streamlit reruns and sessions."""
+    return PipelineCache(
+        PIPELINE_CACHE_DIR,
+        max_memory_items=PIPELINE_CACHE_MEMORY_ITEMS,
+        max_disk_bytes=PIPELINE_CACHE_MAX_MB * 1_000_000
+    )
+
+
+def run_ocr(file_bytes: bytes, file_hash: str) -> tuple:
+    """Run OCR extraction (served from cache when possible) and log results. Returns (text, from_cache)."""
+    with st.spinner("Running OCR..."), tracing.span("ocr", file_bytes=len(file_bytes)) as span:
         try:
-            ocr_text = extract_text_from_document(file_bytes, DOC_INTEL_ENDPOINT, DOC_INTEL_KEY)
-            logger.info("OCR completed successfully (text_length=%d)", len(ocr_text))
-            return ocr_text
+            key = PipelineCache.make_key(
+                "ocr", file_hash, model=OCR_MODELS[OCR_OUTPUT_MODE], mode=OCR_OUTPUT_MODE, version=OCR_VERSION,
+                text_layer=TEXT_LAYER_VERSION if TEXT_LAYER_FAST_PATH else "off",
+                image_prep=(
+                    f"{IMAGE_PREPROCESS_VERSION}:{IMAGE_TARGET_DPI}:{IMAGE_JPEG_QUALITY}" if IMAGE_PREPROCESS else "off"
+                )
+            )
+            ocr_text, from_cache = get_pipeline_cache().get_or_compute(
+                "ocr", key,
+                lambda: extract_text(file_bytes, DOC_INTEL_ENDPOINT, DOC_INTEL_KEY)
+            )
+            logger.info(
+                "OCR completed successfully (text_length=%d, from_cache=%s)",
+                len(ocr_text), from_cache
+            )
+            span.set(from_cache=from_cache, text_chars=len(ocr_text))
+            return ocr_text, from_cache
         except Exception:
+            span.set(status="error")
             logger.exception("OCR extraction failed")
             st.error("OCR extraction failed. Please try another document.")
-            return None
+            return None, False
+
 
+def run_llm_extraction(ocr_text: str, file_hash: str, results_placeholder=None) -> tuple:
+    """
+    Run LLM extraction (served from cache when possible) and log results. Returns (fields, from_cache).
+    When computed, the fields are streamed into `results_placeholder` as they arrive.
+    """
+    last_render = [0.0]
 
-def run_llm_extraction(ocr_text: str) -> dict:
-    """Run LLM extraction and log results."""
-    with st.spinner("Extracting fields..."):
+    def on_partial(partial: dict):
+        now = time.monotonic()
+        if now - last_render[0] >= PARTIAL_RENDER_INTERVAL:
+            last_render[0] = now
+            display_partial_results(results_placeholder, partial)
+
+    with st.spinner("Extracting fields..."), tracing.span("llm_extraction", text_chars=len(ocr_text)) as span:
         try:
-            extracted = extract_fields_with_llm(ocr_text, AOAI_ENDPOINT, AOAI_KEY, AOAI_DEPLOYMENT)
-            logger.info("Field extraction completed (fields=%d)", len(extracted))
-            return extracted
+            key = PipelineCache.make_key(
+                "llm", file_hash,
+                ocr_text=sha256_hex(ocr_text), deployment="+".join(EXTRACTION_TIERS), version=EXTRACTOR_VERSION,
+                cascade=f"{CASCADE_MIN_COMPLETENESS}:{CASCADE_MAX_FORMAT_ERRORS}" if len(EXTRACTION_TIERS) > 1 else "off",
+                rules=RULE_PREEXTRACTION
+            )
+            extracted, from_cache = get_pipeline_cache().get_or_compute(
+                "llm", key,
+                lambda: extract_fields_cascading(
+                    ocr_text, AOAI_ENDPOINT, AOAI_KEY,
+                    EXTRACTION_TIERS, CASCADE_MIN_COMPLETENESS, CASCADE_MAX_FORMAT_ERRORS,
+                    on_partial=on_partial if results_placeholder is not None else None
+                )
+            )
+            logger.info(
+                "Field extraction completed (fields=%d, from_cache=%s)",
+                len(extracted), from_cache
+            )
+            span.set(from_cache=from_cache)
+            return extracted, from_cache
         except Exception:
+            span.set(status="error")
             logger.exception("Field extraction failed")
+            if results_placeholder is not None:
+                results_placeholder.empty()
             st.error("Failed to extract fields using the LLM.")
-            return None
+            return None, False
 
 
 def run_validation(extracted: dict) -> dict:
     """Validate extracted fields and log results."""
-    try:
-        validation = validate_extraction(extracted)
-        logger.info("Validation completed (issues=%d)", len(validation))
-        return validation
-    except Exception:
-        logger.exception("Validation failed")
-        st.error("Validation failed.")
-        return None
+    with tracing.span("validation") as span:
+        try:
+            validation = validate_extraction(extracted)
+            logger.info("Validation completed (issues=%d)", len(validation))
+            return validation
+        except Exception:
+            span.set(status="error")
+            logger.exception("Validation failed")
+            st.error("Validation failed.")
+            return None
 
 
 def run_translation(extracted: dict, validation: dict, language: str):
@@ -96,15 +162,50 @@ def run_translation(extracted: dict, validation: dict, language: str):
     if language.lower() == "english":
         return extracted, validation
 
-    try:
-        extracted_translated = translate_form(extracted, language)
-        validation_translated = translate_form(validation, language) if validation else None
-        logger.info("Translation completed (language=%s)", language)
-        return extracted_translated, validation_translated
-    except Exception:
-        logger.exception("Translation failed")
-        st.error("Translation failed.")
-        return extracted, validation
+    with tracing.span("translation", language=language.lower()) as span:
+        try:
+            extracted_translated = translate_form(extracted, language)
+            validation_translated = translate_form(validation, language) if validation else None
+            logger.info("Translation completed (language=%s)", language)
+            return extracted_translated, validation_translated
+        except Exception:
+            span.set(status="error")
+            logger.exception("Translation failed")
+            st.error("Translation failed.")
+            return extracted, validation
+
+
+def display_cache_status(cache_hits: dict):
+    """Show which pipeline stages were served from cache."""
+    if not cache_hits:
+        return
+    status = " | ".join(
+        f"{stage}: {'cached' if hit else 'computed'}" for stage, hit in cache_hits.items()
+    )
+    st.caption(f"Pipeline stages - {status}")
+
+
+def display_timings(run_trace: tracing.Trace):
+    """Per-stage wall time, payload sizes, tokens and retries of this run."""
+    columns = ("bytes_uploaded", "ocr_pages", "local_pages", "prompt_tokens", "completion_tokens", "retries")
+    rows = []
+    for span in run_trace.spans:
+        row = {"stage": span.name, "wall_ms": round(span.wall_s * 1000, 1), "cached": span.attributes.get("from_cache", "")}
+        row.update({column: span.counters.get(column, "") for column in columns})
+        rows.append(row)
+    if not rows:
+        return
+    with st.expander("Stage timings", expanded=True):
+        st.table(rows)
+        st.caption(f"Total: {sum(span.wall_s for span in run_trace.spans):.2f}s - trace {run_trace.trace_id}")
+
+
+def display_partial_results(placeholder, partial: dict):
+    """Render the fields received so far while the extraction is still streaming."""
+    with placeholder.container():
+        st.subheader("Extracted JSON")
+        st.caption("Receiving fields...")
+        st.json(partial)
 
 
 def display_results(extracted: dict, validation: dict):
@@ -126,30 +227,42 @@ setup_debug(enable=False)
 # ------------------ Streamlit UI ------------------
 st.title("National Insurance Form – Field Extraction")
 language = st.radio("Choose output language:", ("English", "Hebrew"))
+show_timings = st.checkbox("Show stage timings")
 uploaded = st.file_uploader("Upload PDF or Image", type=["pdf", "jpg", "png"])
 
 if uploaded:
     try:
-        file_bytes = uploaded.read()
-        logger.info("File uploaded: %s (size=%d bytes)", uploaded.name, len(file_bytes))
-
-        ocr_text = run_ocr(file_bytes)
-        if not ocr_text:
-            ocr_text = None
-
-        if ocr_text:
-            extracted = run_llm_extraction(ocr_text)
-        else:
-            extracted = None
-
-        if extracted:
-            validation = run_validation(extracted)
-        else:
-            validation = None
-
-        if extracted:
-            extracted, validation = run_translation(extracted, validation, language)
-            display_results(extracted, validation)
+        file_bytes = uploaded.getvalue()
+        file_hash = sha256_hex(file_bytes)
+        logger.info("File uploaded: %s (size=%d bytes, sha256=%s)", uploaded.name, len(file_bytes), file_hash)
+        with tracing.trace(file=uploaded.name, sha256=file_hash) as run_trace:
+            cache_hits = {}
+
+            ocr_text, cache_hits["OCR"] = run_ocr(file_bytes, file_hash)
+            if not ocr_text:
+                ocr_text = None
+
+            # Filled progressively while the LLM streams, replaced by the final results
+            results_placeholder = st.empty()
+
+            if ocr_text:
+                extracted, cache_hits["LLM extraction"] = run_llm_extraction(ocr_text, file_hash, results_placeholder)
+            else:
+                extracted = None
+
+            if extracted:
+                validation = run_validation(extracted)
+            else:
+                validation = None
+
+            if extracted:
+                extracted, validation = run_translation(extracted, validation, language)
+                with results_placeholder.container():
+                    display_cache_status(cache_hits)
+                    display_results(extracted, validation)
+
+        if show_timings:
+            display_timings(run_trace)
 
     except Exception:
         logger.exception("Unexpected error during file processing")
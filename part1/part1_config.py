@@ -40,6 +40,46 @@ try:
         AOAI_DEPLOYMENT
     )
 
+    # ------------------ Tiered extraction ------------------
+    # When set, extraction runs on this cheaper deployment first and escalates to
+    # AOAI_DEPLOYMENT only when the result fails the quality checks
+    AOAI_DEPLOYMENT_MINI = os.getenv("AOAI_DEPLOYMENT_MINI", "")
+    CASCADE_MIN_COMPLETENESS = float(os.getenv("CASCADE_MIN_COMPLETENESS", "50"))
+    CASCADE_MAX_FORMAT_ERRORS = int(os.getenv("CASCADE_MAX_FORMAT_ERRORS", "1"))
+    EXTRACTION_TIERS = list(dict.fromkeys(d for d in (AOAI_DEPLOYMENT_MINI, AOAI_DEPLOYMENT) if d))
+
+    logger.info(
+        "Extraction tiers configured (tiers=%s, min_completeness=%.1f, max_format_errors=%d)",
+        EXTRACTION_TIERS, CASCADE_MIN_COMPLETENESS, CASCADE_MAX_FORMAT_ERRORS
+    )
+
+    # ------------------ Pipeline cache ------------------
+    PIPELINE_CACHE_DIR = os.getenv("PIPELINE_CACHE_DIR", "cache_part1")
+    PIPELINE_CACHE_MEMORY_ITEMS = int(os.getenv("PIPELINE_CACHE_MEMORY_ITEMS", "64"))
+    PIPELINE_CACHE_MAX_MB = int(os.getenv("PIPELINE_CACHE_MAX_MB", "200"))
+
+    logger.info(
+        "Pipeline cache configuration loaded (dir=%s, memory_items=%d, max_mb=%d)",
+        PIPELINE_CACHE_DIR, PIPELINE_CACHE_MEMORY_ITEMS, PIPELINE_CACHE_MAX_MB
+    )
+
+    # ------------------ Extraction service (REST + job queue) ------------------
+    JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join("jobs_part1", "jobs.db"))
+    JOBS_SPOOL_DIR = os.getenv("JOBS_SPOOL_DIR", os.path.join("jobs_part1", "spool"))
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+    SERVICE_OCR_RPM = float(os.getenv("SERVICE_OCR_RPM", "0"))
+    SERVICE_LLM_RPM = float(os.getenv("SERVICE_LLM_RPM", "0"))
+    MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "20"))
+    WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "10"))
+    WEBHOOK_RETRIES = int(os.getenv("WEBHOOK_RETRIES", "3"))
+    # Threads delivering webhooks, so slow or dead webhook URLs never hold an extraction worker
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "2"))
+
+    logger.info(
+        "Extraction service configuration loaded (db=%s, workers=%d)",
+        JOBS_DB_PATH, EXTRACTION_WORKERS
+    )
+
 except Exception:
     logger.exception("Failed to load environment configuration")
     raise
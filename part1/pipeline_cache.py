@@ -0,0 +1,139 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+
+def sha256_hex(data) -> str:
+    """SHA-256 hex digest of bytes or text."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class PipelineCache:
+    """
+    Two-tier cache for Part 1 pipeline stages (OCR, LLM extraction).
+
+    Entries are keyed by the SHA-256 of the input plus the stage's
+    model/version parameters. Lookups hit an in-memory LRU first, then JSON
+    files on disk; the disk tier is evicted oldest-first once it grows
+    beyond `max_disk_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, max_memory_items: int = 64, max_disk_bytes: int = 200_000_000):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(stage: str, input_hash: str, **params) -> str:
+        """Build the cache key of a stage from its input hash and parameters."""
+        payload = json.dumps(
+            {"stage": stage, "input": input_hash, "params": params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return sha256_hex(payload)
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{key}.json")
+
+    def get(self, stage: str, key: str):
+        """Return the cached value or None."""
+        with self._lock:
+            if (stage, key) in self._memory:
+                self._memory.move_to_end((stage, key))
+                logger.debug("Pipeline cache memory hit (stage=%s)", stage)
+                return self._memory[(stage, key)]
+
+        path = self._path(stage, key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # mark as recently used for eviction
+        except Exception:
+            logger.exception("Failed reading pipeline cache entry %s", path)
+            return None
+
+        self._remember(stage, key, value)
+        logger.debug("Pipeline cache disk hit (stage=%s)", stage)
+        return value
+
+    def put(self, stage: str, key: str, value):
+        self._remember(stage, key, value)
+
+        path = self._path(stage, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            logger.exception("Failed writing pipeline cache entry %s", path)
+            return
+
+        self._evict_disk()
+
+    def get_or_compute(self, stage: str, key: str, compute, cacheable=None):
+        """
+        Return (value, from_cache). On a miss `compute()` is called and its
+        result stored, unless `cacheable(value)` returns False.
+        """
+        value = self.get(stage, key)
+        if value is not None:
+            return value, True
+
+        value = compute()
+        if value is not None and (cacheable is None or cacheable(value)):
+            self.put(stage, key, value)
+        return value, False
+
+    def _remember(self, stage: str, key: str, value):
+        with self._lock:
+            self._memory[(stage, key)] = value
+            self._memory.move_to_end((stage, key))
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier fits its size budget."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_disk_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.info("Evicted pipeline cache entry %s (size=%d)", path, size)
+            except OSError:
+                logger.warning("Failed evicting pipeline cache entry %s", path)
@@ -0,0 +1,140 @@
+import os
+import re
+import logging
+from datetime import date
+
+from validation import is_valid_israeli_id, is_valid_date, FIELD_PATTERNS, POSTAL_CODE_PATTERN
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+# Fill mechanically-parsable fields with rules before the LLM, which then only
+# extracts the remaining fields
+RULE_PREEXTRACTION = os.getenv("RULE_PREEXTRACTION", "1") == "1"
+
+# Labels (Hebrew and English form variants) used as position hints
+FIELD_LABELS = {
+    "idNumber": ["ת.ז", "ת\"ז", "מספר זהות", "ID Number", "ID No"],
+    "dateOfBirth": ["תאריך לידה", "Date of Birth"],
+    "dateOfInjury": ["תאריך הפגיעה", "Date of Injury"],
+    "formFillingDate": ["תאריך מילוי הטופס", "Form Filling Date"],
+    "formReceiptDateAtClinic": ["תאריך קבלת הטופס בקופה", "Date of Receipt"],
+    "landlinePhone": ["טלפון קווי", "Landline"],
+    "mobilePhone": ["טלפון נייד", "Mobile"],
+    "postalCode": ["מיקוד", "Postal Code"],
+}
+# Lines after a label searched for its value (stops early at another field's label)
+LABEL_WINDOW = 3
+
+_DATE_RE = re.compile(r"(?<!\d)(\d{1,2})[./-](\d{1,2})[./-](\d{4})(?!\d)")
+# A digit run, digits written one per box ("0 5 0 2 ...") or a dashed phone number
+# ("050-2474947"); separate numbers on one line ("0502474947 16 04 2022") stay apart
+_DIGITS_RE = re.compile(r"(?<!\d)\d(?:[ \t\-]\d(?!\d))+|0\d{1,2}-\d{7}(?!\d)|\d+")
+_MOBILE_RE = re.compile(r"(?<!\d)05\d{8}(?!\d)")
+
+
+def _digit_groups(text: str) -> list:
+    """Numbers in `text`, joining single digits split by spaces or dashes (box-per-digit fields)."""
+    return [re.sub(r"[ \t\-]", "", group) for group in _DIGITS_RE.findall(text)]
+
+
+def parse_id_number(text: str) -> str:
+    for digits in _digit_groups(text):
+        if len(digits) == 9 and is_valid_israeli_id(digits):
+            return digits
+    return ""
+
+
+def parse_phone(text: str, field: str) -> str:
+    for digits in _digit_groups(text):
+        if FIELD_PATTERNS[field].fullmatch(digits):
+            return digits
+    return ""
+
+
+def parse_postal_code(text: str) -> str:
+    for digits in _digit_groups(text):
+        if POSTAL_CODE_PATTERN.fullmatch(digits):
+            return digits
+    return ""
+
+
+def parse_date(text: str) -> dict:
+    """First plausible date in `text` ("14.04.1999" or DDMMYYYY boxes) as a Date dict."""
+    candidates = [match.groups() for match in _DATE_RE.finditer(text)]
+    candidates += [(d[:2], d[2:4], d[4:]) for d in _digit_groups(text) if len(d) == 8]
+    for day, month, year in candidates:
+        value = {"day": day.zfill(2), "month": month.zfill(2), "year": year}
+        if is_valid_date(value) and 1900 <= int(year) <= date.today().year + 1:
+            return value
+    return {}
+
+
+PARSERS = {
+    "idNumber": parse_id_number,
+    "dateOfBirth": parse_date,
+    "dateOfInjury": parse_date,
+    "formFillingDate": parse_date,
+    "formReceiptDateAtClinic": parse_date,
+    "landlinePhone": lambda text: parse_phone(text, "landlinePhone"),
+    "mobilePhone": lambda text: parse_phone(text, "mobilePhone"),
+    "postalCode": parse_postal_code,
+}
+
+
+def _label_position(line: str, labels: list) -> int:
+    """End offset of the first label found in `line`, -1 if none."""
+    for label in labels:
+        index = line.find(label)
+        if index >= 0:
+            return index + len(label)
+    return -1
+
+
+def _value_near_label(lines: list, field: str) -> object:
+    """Parse `field` from the text following its label: rest of the label line, then the next lines."""
+    parser = PARSERS[field]
+    other_labels = [label for name, labels in FIELD_LABELS.items() if name != field for label in labels]
+
+    for index, line in enumerate(lines):
+        position = _label_position(line, FIELD_LABELS[field])
+        if position < 0:
+            continue
+        value = parser(line[position:])
+        if value:
+            return value
+        for next_line in lines[index + 1:index + 1 + LABEL_WINDOW]:
+            if _label_position(next_line, other_labels) >= 0:
+                break
+            value = parser(next_line)
+            if value:
+                return value
+    return None
+
+
+def pre_extract_fields(ocr_text: str) -> dict:
+    """
+    Rule-based extraction of ID number (check digit validated), phone numbers,
+    postal code and Date fields, as a partial InjuryForm dict. Values are taken
+    from the text near their label; a mobile number may also be the only one in
+    the document. Fields not found with confidence are left out for the LLM.
+    """
+    lines = [line.strip() for line in ocr_text.splitlines() if line.strip()]
+    extracted = {}
+
+    for field in PARSERS:
+        value = _value_near_label(lines, field)
+        if value:
+            extracted[field] = value
+
+    if "mobilePhone" not in extracted:
+        mobiles = {digits for line in lines for digits in _digit_groups(line) if _MOBILE_RE.fullmatch(digits)}
+        if len(mobiles) == 1:
+            extracted["mobilePhone"] = mobiles.pop()
+
+    if "postalCode" in extracted:
+        extracted["address"] = {"postalCode": extracted.pop("postalCode")}
+
+    logger.info("Rule-based pre-extraction completed (fields=%s)", sorted(extracted))
+    return extracted
@@ -0,0 +1,89 @@
+import json
+import logging
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def complete_partial_json(text: str) -> str:
+    """
+    Turn a JSON prefix (a streamed completion cut anywhere) into a parsable document:
+    close an open string, drop a dangling key / comma, give a dangling colon a null
+    value and close every open object and array.
+    """
+    stack = []
+    in_string = escape = False
+    expecting_key = []      # per open container: True while an object waits for a key
+    key_start = -1          # start of the last object key not yet followed by ":"
+
+    for index, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            if stack and stack[-1] == "}" and expecting_key[-1]:
+                key_start = index
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            expecting_key.append(ch == "{")
+        elif ch in "}]" and stack:
+            stack.pop()
+            expecting_key.pop()
+        elif ch == ":" and stack:
+            expecting_key[-1] = False
+            key_start = -1
+        elif ch == "," and stack:
+            expecting_key[-1] = stack[-1] == "}"
+
+    completed = text
+    if stack and stack[-1] == "}" and expecting_key[-1] and key_start >= 0:
+        # A key without its value yet: drop it
+        completed = text[:key_start]
+    elif in_string:
+        completed = text[:-1] if escape else text
+        completed += '"'
+
+    completed = completed.rstrip()
+    if completed.endswith(","):
+        completed = completed[:-1]
+    elif completed.endswith(":"):
+        completed += "null"
+    return completed + "".join(reversed(stack))
+
+
+def parse_partial_json(text: str):
+    """Best-effort parse of a JSON prefix; None when nothing parsable has arrived yet."""
+    if not text.strip():
+        return None
+    try:
+        return json.loads(complete_partial_json(text))
+    except json.JSONDecodeError:
+        # e.g. a number or literal cut in the middle; the next chunk will complete it
+        return None
+
+
+class StreamingJSONParser:
+    """Accumulates streamed completion chunks and reports the parsed object when it changes."""
+
+    def __init__(self):
+        self.text = ""
+        self.value = None
+
+    def feed(self, chunk: str):
+        """Add a chunk; return the new partial value, or None if it did not change."""
+        self.text += chunk
+        value = parse_partial_json(self.text)
+        if value is None or value == self.value:
+            return None
+        self.value = value
+        return value
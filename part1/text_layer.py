@@ -0,0 +1,178 @@
+import os
+import re
+import logging
+from io import BytesIO
+
+import tracing
+from ocr import extract_text_from_document, OCR_OUTPUT_MODE
+from ocr_layout import load_template_vocabulary, is_boilerplate
+from image_preprocess import preprocess_image, IMAGE_PREPROCESS
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+# Pre-flight before cloud OCR: PDF pages with a usable embedded text layer are read
+# locally, only scanned pages / photos go to Document Intelligence.
+# Off by default: flattened forms draw checkbox ticks as graphics, which the text
+# layer does not carry (gender / accident location / health fund selections).
+TEXT_LAYER_FAST_PATH = os.getenv("TEXT_LAYER_FAST_PATH", "0") == "1"
+# Minimum non-whitespace characters for a page's text layer to be trusted
+TEXT_LAYER_MIN_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "100"))
+# Maximum share of unmapped glyphs (missing ToUnicode maps, private-use code points)
+TEXT_LAYER_MAX_GARBAGE = 0.05
+# Bump when the locally extracted text changes, to invalidate cached OCR output
+TEXT_LAYER_VERSION = "1"
+
+_HEBREW_WORD_RE = re.compile(r"[א-ת]+")
+_RUN_RE = re.compile(r"[א-ת]+|[^א-ת\s]+|\s+")
+_FINAL_FORMS = "ךםןףץ"
+_NON_FINAL_FORMS = "כמנפצ"
+_MIRRORED = str.maketrans("()[]{}<>", ")(][}{><")
+
+
+def _direction_votes(line: str) -> tuple:
+    """
+    (logical, reversed) evidence from Hebrew final letters: ך ם ן ף ץ only end a word
+    and כ מ נ פ צ never do, so a word starting / ending "the wrong way" is reversed.
+    """
+    logical = reversed_ = 0
+    for match in _HEBREW_WORD_RE.finditer(line):
+        word = match.group()
+        # Abbreviations (קופ"ח, ע"י) legitimately break the rule
+        neighbours = line[max(match.start() - 1, 0):match.start()] + line[match.end():match.end() + 1]
+        if len(word) < 2 or any(c in neighbours for c in "\"'״׳"):
+            continue
+        reversed_ += (word[0] in _FINAL_FORMS) + (word[-1] in _NON_FINAL_FORMS)
+        logical += (word[-1] in _FINAL_FORMS) + (word[0] in _NON_FINAL_FORMS)
+    return logical, reversed_
+
+
+def reverse_visual_line(line: str) -> str:
+    """Visual-order line to logical order: reverse the runs and the letters of Hebrew runs only."""
+    runs = _RUN_RE.findall(line.strip())
+    out = []
+    for run in reversed(runs):
+        if _HEBREW_WORD_RE.fullmatch(run):
+            out.append(run[::-1])
+        else:
+            out.append(run.translate(_MIRRORED))
+    return "".join(out)
+
+
+def fix_visual_hebrew(lines: list, vocabulary: frozenset = None) -> list:
+    """
+    Put lines stored in visual order (typical for digitally filled Hebrew fields) back
+    into logical order. Lines made of the form's own words stay as they are; lines
+    without final-letter evidence follow the majority of the evidenced filled-in lines.
+    """
+    if vocabulary is None:
+        vocabulary = load_template_vocabulary()
+
+    decisions = []
+    filled_logical = filled_reversed = 0
+    for line in lines:
+        logical, reversed_ = _direction_votes(line)
+        words = _HEBREW_WORD_RE.findall(line)
+        if not words or all(word in vocabulary for word in words):
+            decisions.append(False)
+        elif reversed_ == logical:
+            decisions.append(None)
+        else:
+            decisions.append(reversed_ > logical)
+            filled_logical += logical > reversed_
+            filled_reversed += reversed_ > logical
+
+    default = filled_reversed > filled_logical
+    return [
+        reverse_visual_line(line) if (default if decision is None else decision) else line
+        for line, decision in zip(lines, decisions)
+    ]
+
+
+def is_usable_text_layer(text: str) -> bool:
+    """True when a page's embedded text is long enough and mostly mapped to real characters."""
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < TEXT_LAYER_MIN_CHARS:
+        return False
+    garbage = sum(1 for c in chars if c == "\ufffd" or "\ue000" <= c <= "\uf8ff") + 5 * text.count("(cid:")
+    return garbage / len(chars) <= TEXT_LAYER_MAX_GARBAGE
+
+
+def read_text_layers(file_bytes: bytes) -> list:
+    """Embedded text per PDF page ("" for pages without text; [] for images or unreadable PDFs)."""
+    if not file_bytes.startswith(b"%PDF"):
+        return []
+    try:
+        from pypdf import PdfReader
+
+        return [page.extract_text() or "" for page in PdfReader(BytesIO(file_bytes)).pages]
+    except Exception:
+        logger.warning("Could not read PDF text layer, falling back to OCR")
+        return []
+
+
+def _page_subset(file_bytes: bytes, page_indexes: list) -> bytes:
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(BytesIO(file_bytes))
+    writer = PdfWriter()
+    for page_index in page_indexes:
+        writer.add_page(reader.pages[page_index])
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _local_page_text(text: str, page_number: int, mode: str, vocabulary: frozenset) -> str:
+    lines = fix_visual_hebrew([line.strip() for line in text.splitlines() if line.strip()], vocabulary)
+    if mode != "compact":
+        return "\n".join(lines)
+    lines = [line for line in lines if not is_boilerplate(line, vocabulary)]
+    return f"## Page {page_number}\n" + "\n".join(lines) if lines else ""
+
+
+def extract_text(file_bytes, endpoint, key, mode: str = None) -> str:
+    """
+    Document text for the extraction prompt: PDF pages with a usable text layer are
+    read locally, contiguous runs of the remaining pages go to cloud OCR, and the
+    result is merged in page order. Everything goes to OCR when the fast path is off.
+    Photos are pre-processed first when IMAGE_PREPROCESS is on.
+    """
+    mode = mode or OCR_OUTPUT_MODE
+    if IMAGE_PREPROCESS:
+        file_bytes = preprocess_image(file_bytes)
+    layers = read_text_layers(file_bytes) if TEXT_LAYER_FAST_PATH else []
+    if not layers:
+        return extract_text_from_document(file_bytes, endpoint, key, mode=mode)
+
+    usable = [is_usable_text_layer(text) for text in layers]
+    local_pages = sum(usable)
+    logger.info(
+        "Text layer pre-flight completed (pages=%d, local_pages=%d, ocr_pages=%d)",
+        len(layers), local_pages, len(layers) - local_pages
+    )
+    tracing.add(local_pages=local_pages)
+    if not local_pages:
+        return extract_text_from_document(file_bytes, endpoint, key, mode=mode)
+
+    vocabulary = load_template_vocabulary()
+    blocks = []
+    page_index = 0
+    while page_index < len(layers):
+        if usable[page_index]:
+            blocks.append(_local_page_text(layers[page_index], page_index + 1, mode, vocabulary))
+            page_index += 1
+            continue
+
+        run_start = page_index
+        while page_index < len(layers) and not usable[page_index]:
+            page_index += 1
+        blocks.append(extract_text_from_document(
+            _page_subset(file_bytes, list(range(run_start, page_index))),
+            endpoint, key, mode=mode, page_offset=run_start
+        ))
+
+    extracted_text = "\n".join(block for block in blocks if block)
+    logger.info("Text extraction completed (characters=%d)", len(extracted_text))
+    return extracted_text
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+# IMPORTANT:
+# Logging is configured centrally in logging_config.py
+logger = logging.getLogger(__name__)
+
+# Finished spans are appended to this JSONL file (one line per span); TRACING=0 disables writing
+TRACING = os.getenv("TRACING", "1") == "1"
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join("traces_part1", "spans.jsonl"))
+
+_current_span = ContextVar("current_span", default=None)
+_current_trace = ContextVar("current_trace", default=None)
+_write_lock = threading.Lock()
+
+
+class Span:
+    """
+    One timed pipeline stage. Counters (bytes_uploaded, ocr_pages, prompt_tokens,
+    retries, ...) are summed with add(), from this thread or from work submitted
+    with run_in_context(); attributes (from_cache, status, ...) are set with set().
+    """
+
+    def __init__(self, name: str, trace_id: str, parent: str = None, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent
+        self.attributes = dict(attributes)
+        self.counters = {}
+        self.started_at = time.time()
+        self.wall_s = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                if value is not None:
+                    self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.wall_s = time.perf_counter() - self._start
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "wall_s": round(self.wall_s, 4) if self.wall_s is not None else None,
+            **self.attributes,
+            **self.counters,
+        }
+
+
+class Trace:
+    """Spans of one document run, in the order they finished."""
+
+    def __init__(self, trace_id: str = None, **attributes):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.attributes = attributes
+        self.spans = []
+
+
+@contextmanager
+def trace(trace_id: str = None, **attributes):
+    """Group the spans opened inside the block under one trace id (e.g. per uploaded file)."""
+    current = Trace(trace_id, **attributes)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time the block as a span of the current trace. The span is written to TRACE_FILE
+    when the block exits, with status "error" if it raised.
+    """
+    current_trace = _current_trace.get()
+    parent = _current_span.get()
+    current = Span(
+        name,
+        trace_id=current_trace.trace_id if current_trace else uuid.uuid4().hex[:16],
+        parent=parent.span_id if parent else None,
+        **(current_trace.attributes if current_trace else {}),
+        **attributes
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+        current.attributes.setdefault("status", "ok")
+    except BaseException:
+        current.set(status="error")
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+        if current_trace is not None:
+            current_trace.spans.append(current)
+        _write(current)
+
+
+def add(**counts):
+    """Add to the counters of the active span (no-op outside a span)."""
+    current = _current_span.get()
+    if current is not None:
+        current.add(**counts)
+
+
+def run_in_context(fn):
+    """Wrap `fn` for a worker thread so its add() calls reach the submitting thread's span."""
+    context = copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+def _write(current: Span):
+    if not TRACING:
+        return
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(TRACE_FILE)), exist_ok=True)
+        line = json.dumps(current.to_dict(), ensure_ascii=False, default=str)
+        with _write_lock, open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        logger.warning("Failed writing span %s to %s", current.name, TRACE_FILE)
@@ -1,4 +1,6 @@
+import re
 import logging
+from datetime import date
 
 # IMPORTANT:
 # Logging is configured centrally in logging_config.py
@@ -8,6 +10,65 @@ REQUIRED_FIELDS = [
     "firstName", "lastName", "idNumber", "dateOfBirth", "dateOfInjury"
 ]
 
+DATE_FIELDS = ["dateOfBirth", "dateOfInjury", "formFillingDate", "formReceiptDateAtClinic"]
+
+# Expected formats of filled-in values (separators stripped before matching)
+FIELD_PATTERNS = {
+    "mobilePhone": re.compile(r"05\d{8}"),
+    "landlinePhone": re.compile(r"0\d{8,9}"),
+    "timeOfInjury": re.compile(r"([01]?\d|2[0-3]):[0-5]\d"),
+}
+POSTAL_CODE_PATTERN = re.compile(r"\d{5}|\d{7}")
+_SEPARATORS_RE = re.compile(r"[\s\-/.()]")
+
+
+def is_valid_israeli_id(value: str) -> bool:
+    """Israeli ID number: up to 9 digits (left-padded with zeros) with a valid check digit."""
+    if not value.isdigit() or len(value) > 9:
+        return False
+    total = 0
+    for index, digit in enumerate(value.zfill(9)):
+        product = int(digit) * (index % 2 + 1)
+        total += product - 9 if product > 9 else product
+    return total % 10 == 0
+
+
+def is_valid_date(value: dict) -> bool:
+    """Date fields (day / month / year) forming a real calendar date."""
+    try:
+        return bool(date(int(value.get("year", "")), int(value.get("month", "")), int(value.get("day", ""))))
+    except (TypeError, ValueError):
+        return False
+
+
+def check_field_formats(data: dict) -> list:
+    """
+    Names of filled-in fields whose value has an invalid format
+    (ID check digit, calendar dates, phone numbers, postal code, time).
+    Empty fields are left to the missing-field / completeness checks.
+    """
+    invalid = []
+
+    id_number = (data.get("idNumber") or "").strip()
+    if id_number and not is_valid_israeli_id(_SEPARATORS_RE.sub("", id_number)):
+        invalid.append("idNumber")
+
+    for field in DATE_FIELDS:
+        value = data.get(field)
+        if isinstance(value, dict) and any((v or "").strip() for v in value.values()) and not is_valid_date(value):
+            invalid.append(field)
+
+    for field, pattern in FIELD_PATTERNS.items():
+        value = (data.get(field) or "").strip()
+        if value and not pattern.fullmatch(_SEPARATORS_RE.sub("", value) if field != "timeOfInjury" else value):
+            invalid.append(field)
+
+    postal_code = ((data.get("address") or {}).get("postalCode") or "").strip()
+    if postal_code and not POSTAL_CODE_PATTERN.fullmatch(_SEPARATORS_RE.sub("", postal_code)):
+        invalid.append("address.postalCode")
+
+    return invalid
+
 
 def validate_extraction(data: dict) -> dict:
     """
@@ -50,7 +111,12 @@ def validate_extraction(data: dict) -> dict:
         count_fields(data)
 
         for field in REQUIRED_FIELDS:
-            if not data.get(field) or not isinstance(data.get(field), str) or not data.get(field).strip():
+            value = data.get(field)
+            if isinstance(value, dict):
+                # Date fields count as present only when day, month and year are all filled
+                if not value or not all(isinstance(v, str) and v.strip() for v in value.values()):
+                    missing.append(field)
+            elif not value or not isinstance(value, str) or not value.strip():
                 missing.append(field)
 
         completeness_score = round((filled / total) * 100, 2) if total > 0 else 0.0
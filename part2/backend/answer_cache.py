@@ -0,0 +1,143 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from part2.backend.question_cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))  # entries per (hmo, tier, language)
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))  # min cosine similarity
+
+
+class _Bucket:
+    """
+    Answers of one (hmo, tier, language) key with their normalized question embeddings,
+    plus an LRU map of normalized question text -> answer for exact repeats.
+    """
+
+    def __init__(self):
+        self.embeddings = None
+        self.questions = []
+        self.answers = []
+        self.last_used = []
+        self.exact = OrderedDict()
+
+
+class SemanticAnswerCache:
+    """
+    Size-bounded cache of /ask answers keyed by (hmo_name, insurance_tier, language).
+
+    A lookup returns a stored answer when the normalized question text was
+    asked before, or when the new question's embedding is within `threshold`
+    cosine similarity of a cached question; questions answered without an
+    embedding (decisive lexical matches) are only found by text. Entries are
+    tied to the knowledge base version they were generated from and are
+    dropped as soon as a different version is seen.
+    """
+
+    def __init__(self, max_size: int = ANSWER_CACHE_SIZE, threshold: float = ANSWER_CACHE_THRESHOLD):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.kb_version = None
+        self.hits = 0
+        self.misses = 0
+        self._buckets = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(b.answers) for b in self._buckets.values())
+
+    def invalidate(self, kb_version=None):
+        """Drop every cached answer, e.g. after the knowledge base is reloaded."""
+        with self._lock:
+            self._buckets.clear()
+            self.kb_version = kb_version
+        logger.info("Semantic answer cache invalidated | kb_version=%s", kb_version)
+
+    def _check_version(self, kb_version):
+        if kb_version != self.kb_version:
+            self._buckets.clear()
+            self.kb_version = kb_version
+            logger.info("Semantic answer cache reset for new knowledge base | kb_version=%s", kb_version)
+
+    @staticmethod
+    def _normalize(embedding):
+        q = np.asarray(embedding, dtype=np.float32)
+        q_norm = np.linalg.norm(q)
+        return q / q_norm if q_norm > 0 else None
+
+    def get(self, key: tuple, embedding, kb_version=None, question: str = None):
+        """
+        Return (answer, similarity) of the closest cached question or None; an exact
+        repeat of `question` returns similarity 1.0. `embedding` may be None.
+        """
+        q = self._normalize(embedding) if embedding is not None else None
+
+        with self._lock:
+            self._check_version(kb_version)
+            bucket = self._buckets.get(key)
+            if bucket is not None and question is not None:
+                text = normalize_question(question)
+                if text in bucket.exact:
+                    bucket.exact.move_to_end(text)
+                    self.hits += 1
+                    return bucket.exact[text], 1.0
+
+            if bucket is not None and bucket.answers and q is not None:
+                scores = bucket.embeddings @ q
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._clock += 1
+                    bucket.last_used[best] = self._clock
+                    self.hits += 1
+                    return bucket.answers[best], float(scores[best])
+
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, question: str, embedding, answer: str, kb_version=None):
+        """Cache `answer` for `question`; without an embedding it is only served to exact repeats."""
+        if self.max_size <= 0:
+            return
+        q = self._normalize(embedding) if embedding is not None else None
+
+        with self._lock:
+            self._check_version(kb_version)
+            bucket = self._buckets.setdefault(key, _Bucket())
+            text = normalize_question(question)
+            bucket.exact[text] = answer
+            bucket.exact.move_to_end(text)
+            while len(bucket.exact) > self.max_size:
+                bucket.exact.popitem(last=False)
+
+            if q is None:
+                return
+            self._clock += 1
+
+            if len(bucket.answers) < self.max_size:
+                row = q[np.newaxis, :]
+                bucket.embeddings = row if bucket.embeddings is None else np.vstack([bucket.embeddings, row])
+                bucket.questions.append(question)
+                bucket.answers.append(answer)
+                bucket.last_used.append(self._clock)
+            else:
+                # Evict the least recently used entry of this key
+                slot = int(np.argmin(bucket.last_used))
+                bucket.embeddings[slot] = q
+                bucket.questions[slot] = question
+                bucket.answers[slot] = answer
+                bucket.last_used[slot] = self._clock
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self),
+            "exact_size": sum(len(b.exact) for b in self._buckets.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
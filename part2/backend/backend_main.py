@@ -9,7 +9,9 @@ from fastapi import FastAPI
 from part2.backend.q_and_a_router import q_and_a_router
 from part2.backend.user_info_collect_router import user_info_collect_router
 from part2.backend.html_loader import preprocess_html
-from part2.backend.openai_client import init_client
+from part2.backend.openai_client import init_client, init_async_client
+from part2.backend.question_cache import QuestionEmbeddingCache
+from part2.backend.answer_cache import SemanticAnswerCache
 from part2.backend.logging_config import setup_logging
 
 # ------------------ Helper Functions ------------------
@@ -50,7 +52,8 @@ async def lifespan(app: FastAPI):
     # Initialize Azure OpenAI client
     try:
         app.state.azure_client = init_client()
-        logger.info("AzureOpenAI client initialized successfully")
+        app.state.async_client = init_async_client()
+        logger.info("AzureOpenAI clients initialized successfully")
     except Exception:
         logger.exception("Failed to initialize AzureOpenAI client")
         raise RuntimeError("Startup failed: AzureOpenAI client could not be initialized")
@@ -58,10 +61,10 @@ async def lifespan(app: FastAPI):
     # Preprocess HTMLs and create embeddings
     try:
         logger.info("Starting HTML preprocessing and embedding generation")
-        app.state.all_chunks = preprocess_html(client=app.state.azure_client)
+        app.state.chunk_index = preprocess_html(client=app.state.azure_client)
         logger.info(
             "HTML preprocessing completed successfully. Loaded %d chunks",
-            len(app.state.all_chunks)
+            len(app.state.chunk_index)
         )
     except FileNotFoundError as e:
         logger.error("HTML data directory not found: %s", e)
@@ -70,10 +73,26 @@ async def lifespan(app: FastAPI):
         logger.exception("Unexpected error during HTML preprocessing")
         raise RuntimeError("Startup failed: HTML preprocessing error")
 
+    app.state.question_cache = QuestionEmbeddingCache()
+    logger.info(
+        "Question embedding cache ready | max_size=%d | ttl=%s",
+        app.state.question_cache.max_size, app.state.question_cache.ttl or "none"
+    )
+
+    app.state.answer_cache = SemanticAnswerCache()
+    app.state.answer_cache.invalidate(app.state.chunk_index.version)
+    logger.info(
+        "Semantic answer cache ready | max_size=%d per key | threshold=%.2f",
+        app.state.answer_cache.max_size, app.state.answer_cache.threshold
+    )
+
     logger.info("Backend startup completed successfully")
     yield
     # Shutdown
     logger.info("Backend shutting down")
+    logger.info("Question embedding cache stats: %s", app.state.question_cache.stats())
+    logger.info("Semantic answer cache stats: %s", app.state.answer_cache.stats())
+    await app.state.async_client.close()
     logger.info("Backend shutdown completed")
 
 
@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import numpy as np
+
+from part2.backend.lexical_index import BM25Index, fuse_scores, normalize_service_name
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row; zero rows stay zero."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the `top_k` highest scores, best first, without a full sort."""
+    if top_k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if top_k < scores.size:
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(scores.size)
+
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+# (hmo, tier) key of the general, non-table content every query also searches
+GENERAL_PARTITION = ("כללי", "כללי")
+
+
+def _contains_phrase(tokens: list, phrase: tuple) -> bool:
+    """Whether `phrase` occurs in `tokens` as consecutive items."""
+    size = len(phrase)
+    return any(tuple(tokens[i:i + size]) == phrase for i in range(len(tokens) - size + 1))
+
+
+class ChunkPartition:
+    """
+    Chunks of a single (hmo, tier) slice.
+
+    Embeddings live in one contiguous float32 matrix whose rows are
+    normalized ahead of time, so cosine similarity is a single
+    matrix-vector product. Chunk metadata is kept in parallel arrays;
+    `rows` are the chunks' document ids in the index-wide BM25 index.
+    """
+
+    def __init__(self, embeddings, texts, service_names, rows=None):
+        self.embeddings = np.ascontiguousarray(normalize_rows(np.asarray(embeddings, dtype=np.float32)))
+        self.texts = np.asarray(texts, dtype=object)
+        self.service_names = np.asarray(service_names, dtype=object)
+        self.rows = np.asarray(rows if rows is not None else [], dtype=np.intp)
+        self.service_terms = []
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def score(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every chunk to an already-normalized query."""
+        return self.embeddings @ query
+
+
+class ChunkIndex:
+    """
+    In-memory retrieval store built once at startup, partitioned by
+    (hmo, tier). A query touches only the user's partition plus the shared
+    general partition, so its cost scales with the partition size rather
+    than with the whole knowledge base.
+
+    A BM25 index over all chunk texts (Hebrew prefix letters stripped) scores
+    the same candidates lexically; its scores are fused with the cosine
+    similarities, and a question naming one of the partition's services can
+    be answered from the lexical ranking alone, without embedding it.
+    """
+
+    def __init__(self, partitions: dict, version: str = None, lexical: BM25Index = None):
+        self.partitions = partitions
+        self.version = version
+        self.lexical = lexical or BM25Index([])
+
+    @classmethod
+    def from_chunks(cls, chunks: list) -> "ChunkIndex":
+        """Build the index from the chunk dicts produced by embedding the HTML tasks."""
+        grouped = {}
+        for chunk in chunks:
+            if not all(k in chunk for k in ("text", "service_name", "hmo", "tier", "embedding")):
+                logger.warning("Chunk missing expected keys: %s", chunk)
+                continue
+            grouped.setdefault((chunk["hmo"], chunk["tier"]), []).append(chunk)
+
+        texts = [c["text"] for group in grouped.values() for c in group]
+        lexical = BM25Index(texts)
+
+        partitions = {}
+        offset = 0
+        for key, group in grouped.items():
+            partition = ChunkPartition(
+                np.stack([np.asarray(c["embedding"], dtype=np.float32) for c in group]),
+                [c["text"] for c in group],
+                [c["service_name"] for c in group],
+                rows=range(offset, offset + len(group)),
+            )
+            if key != GENERAL_PARTITION:
+                partition.service_terms = [
+                    tuple(lexical.tokens(normalize_service_name(c["service_name"]))) for c in group
+                ]
+            partitions[key] = partition
+            offset += len(group)
+
+        # Fingerprint of the knowledge base content, used to invalidate derived caches
+        digest = hashlib.sha256()
+        for key in sorted(grouped):
+            for text in sorted(c["text"] for c in grouped[key]):
+                digest.update(f"{key}\x00{text}\x00".encode("utf-8"))
+
+        index = cls(partitions, version=digest.hexdigest()[:16], lexical=lexical)
+        logger.info(
+            "Chunk index built | chunks=%d | partitions=%d | general=%d | version=%s",
+            len(index), len(partitions), len(partitions.get(GENERAL_PARTITION, ())), index.version
+        )
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(p) for p in self.partitions.values())
+
+    def _partitions(self, hmo: str, tier: str) -> list:
+        keys = [(hmo, tier)]
+        if GENERAL_PARTITION not in keys:
+            keys.append(GENERAL_PARTITION)
+        return [self.partitions[k] for k in keys if k in self.partitions]
+
+    def search(self, query: np.ndarray, hmo: str, tier: str, top_k: int = 3, question: str = None) -> list:
+        """
+        Return up to `top_k` (score, text) pairs from the (hmo, tier) partition
+        and the general partition, ordered by cosine similarity to `query`, or
+        by the fused cosine + BM25 score when the `question` text is given.
+        """
+        partitions = self._partitions(hmo, tier)
+        if not partitions:
+            return []
+
+        q = np.asarray(query, dtype=np.float32)
+        q_norm = np.linalg.norm(q)
+        if q_norm > 0:
+            q = q / q_norm
+
+        scores = np.concatenate([p.score(q) for p in partitions])
+        texts = np.concatenate([p.texts for p in partitions])
+        if question:
+            lexical = self.lexical.score(self.lexical.terms(question))
+            scores = fuse_scores(scores, np.concatenate([lexical[p.rows] for p in partitions]))
+
+        best = top_k_indices(scores, top_k)
+        return [(float(scores[i]), texts[i]) for i in best]
+
+    def lexical_search(self, question: str, hmo: str, tier: str, top_k: int = 3) -> tuple:
+        """
+        BM25 ranking of the same candidates as search(). Returns (decisive, results):
+        decisive when exactly one service name of the (hmo, tier) table appears in the
+        question as a contiguous phrase and its words are most of the question's
+        content terms; that service's chunk then comes first.
+        """
+        partitions = self._partitions(hmo, tier)
+        if not partitions:
+            return False, []
+
+        tokens = self.lexical.tokens(question)
+        terms = list(dict.fromkeys(tokens))
+        lexical = self.lexical.score(terms)
+        scores = np.concatenate([lexical[p.rows] for p in partitions])
+        texts = np.concatenate([p.texts for p in partitions])
+
+        matches = [
+            index for index, service in enumerate(partitions[0].service_terms)
+            if service and _contains_phrase(tokens, service)
+        ]
+        content = self.lexical.content_terms(terms)
+        decisive = len(matches) == 1 and 2 * len(set(partitions[0].service_terms[matches[0]])) > len(content)
+
+        best = list(top_k_indices(scores, top_k))
+        if decisive:
+            match = matches[0]
+            best = [match] + [i for i in best if i != match][:top_k - 1]
+        return decisive, [(float(scores[i]), texts[i]) for i in best]
@@ -0,0 +1,106 @@
+import os
+import hashlib
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "embedding_cache")
+)
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Content address of a chunk: SHA-256 over (embedding model, chunk text)."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk, content-addressed store of chunk embeddings.
+
+    Vectors are kept as a single float32 matrix in a .npz file next to the
+    matching SHA-256 keys, so a warm start is one file read instead of
+    several embedding API round trips.
+    """
+
+    def __init__(self, model: str, cache_dir: str = None):
+        self.model = model
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.path = os.path.join(self.cache_dir, f"{model}.npz")
+        self.hits = 0
+        self.misses = 0
+        self._vectors = {}
+        self._used = set()
+        self._dirty = False
+
+    def load(self):
+        """Load cached vectors from disk. A missing or corrupt file starts an empty cache."""
+        if not os.path.exists(self.path):
+            logger.info("Embedding cache not found, starting empty | path=%s", self.path)
+            return self
+
+        try:
+            with np.load(self.path) as data:
+                keys = data["keys"]
+                vectors = data["vectors"]
+            self._vectors = {str(k): vectors[i] for i, k in enumerate(keys)}
+            logger.info(
+                "Embedding cache loaded | entries=%d | path=%s",
+                len(self._vectors), self.path
+            )
+        except Exception:
+            logger.exception("Failed loading embedding cache, starting empty | path=%s", self.path)
+            self._vectors = {}
+
+        return self
+
+    def get(self, text: str):
+        """Return the cached vector for `text` or None, updating hit/miss counters."""
+        key = embedding_key(self.model, text)
+        vector = self._vectors.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._used.add(key)
+        return vector
+
+    def put(self, text: str, vector):
+        key = embedding_key(self.model, text)
+        self._vectors[key] = np.asarray(vector, dtype=np.float32)
+        self._used.add(key)
+        self._dirty = True
+
+    def save(self):
+        """
+        Persist the entries used in this run, dropping vectors of chunks that
+        no longer exist in the knowledge base. Written atomically.
+        """
+        stale = len(self._vectors) - len(self._used)
+        if not self._dirty and stale == 0:
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            keys = sorted(self._used)
+            if keys:
+                vectors = np.stack([self._vectors[k] for k in keys]).astype(np.float32)
+            else:
+                vectors = np.zeros((0, 0), dtype=np.float32)
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, keys=np.array(keys, dtype="U64"), vectors=vectors)
+            os.replace(tmp_path, self.path)
+
+            self._vectors = {k: self._vectors[k] for k in keys}
+            self._dirty = False
+            logger.info(
+                "Embedding cache saved | entries=%d | pruned=%d | path=%s",
+                len(keys), stale, self.path
+            )
+        except Exception:
+            logger.exception("Failed saving embedding cache | path=%s", self.path)
@@ -4,8 +4,13 @@ import logging
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from part2.backend.embedding_cache import EmbeddingCache
+from part2.backend.chunk_index import ChunkIndex
+
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
 
 # =========================
 # Embedding helper
@@ -15,7 +20,7 @@ def generate_embedding_batch(client, texts, service_names, hmos, tiers):
         logger.debug("Generating embeddings | batch_size=%d", len(texts))
 
         response = client.embeddings.create(
-            model="text-embedding-ada-002",
+            model=EMBEDDING_MODEL,
             input=texts
         )
 
@@ -135,7 +140,11 @@ def extract_table_chunks(soup):
 # =========================
 # Main pipeline
 # =========================
-def preprocess_html(client, html_dir=None, max_workers=5, batch_size=50):
+def preprocess_html(client, html_dir=None, max_workers=5, batch_size=50, cache_dir=None):
+    """
+    Parse the HTML knowledge base, embed its chunks (reusing cached vectors)
+    and return a ChunkIndex partitioned by (hmo, tier).
+    """
     start_time = time.time()
 
     if html_dir is None:
@@ -168,32 +177,58 @@ def preprocess_html(client, html_dir=None, max_workers=5, batch_size=50):
 
     if not tasks:
         logger.warning("No embedding tasks collected")
-        return []
+        return ChunkIndex.from_chunks([])
 
-    # Batch + concurrency
-    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+    # Serve unchanged chunks from the on-disk embedding cache
+    cache = EmbeddingCache(EMBEDDING_MODEL, cache_dir).load()
     all_chunks = []
+    pending = []
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(
-                generate_embedding_batch,
-                client,
-                [t[0] for t in batch],
-                [t[1] for t in batch],
-                [t[2] for t in batch],
-                [t[3] for t in batch],
-            )
-            for batch in batches
-        ]
+    for text, service_name, hmo, tier in tasks:
+        vector = cache.get(text)
+        if vector is None:
+            pending.append((text, service_name, hmo, tier))
+            continue
+
+        all_chunks.append({
+            "service_name": service_name,
+            "hmo": hmo,
+            "tier": tier,
+            "text": text,
+            "embedding": vector
+        })
+
+    # Batch + concurrency, only for new or changed chunks
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    if batches:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    generate_embedding_batch,
+                    client,
+                    [t[0] for t in batch],
+                    [t[1] for t in batch],
+                    [t[2] for t in batch],
+                    [t[3] for t in batch],
+                )
+                for batch in batches
+            ]
+
+            for future in as_completed(futures):
+                for chunk in future.result():
+                    cache.put(chunk["text"], chunk["embedding"])
+                    all_chunks.append(chunk)
 
-        for future in as_completed(futures):
-            all_chunks.extend(future.result())
+    cache.save()
+    chunk_index = ChunkIndex.from_chunks(all_chunks)
 
     logger.info(
-        "Finished preprocessing | chunks=%d | time=%.2fs",
+        "Finished preprocessing | chunks=%d | cache_hits=%d | cache_misses=%d | time=%.2fs",
         len(all_chunks),
+        cache.hits,
+        cache.misses,
         time.time() - start_time
     )
 
-    return all_chunks
+    return chunk_index
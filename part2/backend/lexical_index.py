@@ -0,0 +1,137 @@
+import os
+import re
+import math
+import logging
+import numpy as np
+
+from part2.backend.question_cache import strip_niqqud
+
+logger = logging.getLogger(__name__)
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.5"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+# Share of the fused retrieval score coming from BM25 (the rest is cosine similarity)
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "0.3"))
+# Skip the question embedding when the question names a service of the user's table
+LEXICAL_SKIP_EMBEDDING = os.getenv("LEXICAL_SKIP_EMBEDDING", "1") == "1"
+
+# One-letter Hebrew prefixes (and, the, in, to, from, that); at most two are stacked ("ובמרפאה")
+HEBREW_PREFIXES = "והבלמש"
+MAX_PREFIXES = 2
+
+# Question words, pronouns and generic price/coverage words; they do not say which service is meant
+QUESTION_STOPWORDS = frozenset(
+    "מה כמה מי איך האם אם איפה מתי למה יש אין זה זו זאת את של שלי שלו שלה שלנו אני אנחנו הוא היא הם "
+    "עם על אל גם או כל לי לו לנו רק עבור לגבי אפשר ניתן צריך רוצה מגיע מקבל לקבל כולל כוללים "
+    "עולה עולים עלות מחיר הנחה כיסוי מכוסה זכאי זכאות".split()
+)
+_TOKEN_RE = re.compile(r"[א-ת]+|[a-z]+|\d+")
+_GERESH_RE = re.compile(r"[\"'״׳]")
+_PARENTHESES_RE = re.compile(r"\([^)]*\)")
+
+
+def surface_tokens(text: str) -> list:
+    """Lower-cased words and numbers, without niqqud; acronym quotes are dropped (קופ"ח -> קופח)."""
+    text = _GERESH_RE.sub("", strip_niqqud(text)).casefold()
+    return _TOKEN_RE.findall(text)
+
+
+def strip_prefixes(token: str, vocabulary) -> str:
+    """
+    Shortest form of `token` with up to MAX_PREFIXES prefix letters removed that is
+    itself a word of `vocabulary` ("ללידה" -> "לידה", "בהריון" -> "הריון"); words whose
+    first letters are part of the stem ("שורש", "הנחה") are left alone.
+    """
+    best = token
+    candidate = token
+    for _ in range(MAX_PREFIXES):
+        if len(candidate) <= 2 or candidate[0] not in HEBREW_PREFIXES:
+            break
+        candidate = candidate[1:]
+        if candidate in vocabulary:
+            best = candidate
+    return best
+
+
+def normalize_service_name(name: str) -> str:
+    """Service name without its parenthesized alias ("דיקור סיני (אקופונקטורה)" -> "דיקור סיני")."""
+    return _PARENTHESES_RE.sub(" ", name)
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the knowledge base chunks, built once at startup.
+
+    Every posting stores its precomputed idf * tf-saturation weight, so scoring
+    a question is one scatter-add per query term. Terms are normalized with
+    strip_prefixes against the vocabulary of the indexed texts.
+    """
+
+    def __init__(self, texts: list, k1: float = BM25_K1, b: float = BM25_B):
+        documents = [surface_tokens(text) for text in texts]
+        self.vocabulary = frozenset(token for document in documents for token in document)
+        self.stopwords = QUESTION_STOPWORDS | {self.normalize(word) for word in QUESTION_STOPWORDS}
+        documents = [[self.normalize(token) for token in document] for document in documents]
+
+        self.size = len(documents)
+        lengths = np.asarray([len(d) for d in documents], dtype=np.float32)
+        average_length = float(lengths.mean()) if self.size else 0.0
+
+        term_docs = {}
+        for doc_id, document in enumerate(documents):
+            counts = {}
+            for term in document:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                term_docs.setdefault(term, []).append((doc_id, tf))
+
+        self.idf = {}
+        self.postings = {}
+        for term, docs in term_docs.items():
+            idf = math.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            doc_ids = np.asarray([d for d, _ in docs], dtype=np.intp)
+            tfs = np.asarray([tf for _, tf in docs], dtype=np.float32)
+            norm = k1 * (1 - b + b * lengths[doc_ids] / average_length)
+            self.idf[term] = idf
+            self.postings[term] = (doc_ids, (idf * tfs * (k1 + 1) / (tfs + norm)).astype(np.float32))
+
+        logger.info("BM25 index built | documents=%d | terms=%d", self.size, len(self.postings))
+
+    def normalize(self, token: str) -> str:
+        return strip_prefixes(token, self.vocabulary)
+
+    def tokens(self, text: str) -> list:
+        """Normalized terms of `text`, in order and with repeats."""
+        return [self.normalize(token) for token in surface_tokens(text)]
+
+    def terms(self, text: str) -> list:
+        """Distinct normalized terms of `text`, in order."""
+        return list(dict.fromkeys(self.tokens(text)))
+
+    def content_terms(self, terms: list) -> list:
+        """`terms` without QUESTION_STOPWORDS."""
+        return [term for term in terms if term not in self.stopwords]
+
+    def score(self, terms: list) -> np.ndarray:
+        """BM25 score of every indexed document for the (normalized) query `terms`."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                doc_ids, weights = posting
+                scores[doc_ids] += weights
+        return scores
+
+
+def fuse_scores(vector_scores: np.ndarray, lexical_scores: np.ndarray, lexical_weight: float = HYBRID_LEXICAL_WEIGHT) -> np.ndarray:
+    """
+    Convex combination of min-max normalized cosine similarities and max-normalized
+    BM25 scores over the same candidates (both end up in [0, 1]).
+    """
+    if vector_scores.size == 0:
+        return vector_scores
+    low, high = float(vector_scores.min()), float(vector_scores.max())
+    vector = (vector_scores - low) / (high - low) if high > low else np.zeros_like(vector_scores)
+    top = float(lexical_scores.max())
+    lexical = lexical_scores / top if top > 0 else np.zeros_like(lexical_scores)
+    return (1 - lexical_weight) * vector + lexical_weight * lexical
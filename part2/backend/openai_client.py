@@ -1,7 +1,8 @@
 import os
 import logging
+import httpx
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI, DefaultAsyncHttpxClient
 
 # Load environment variables from .env file
 load_dotenv()  # optionally, pass path: load_dotenv(dotenv_path="path/to/.env")
@@ -10,30 +11,45 @@ load_dotenv()  # optionally, pass path: load_dotenv(dotenv_path="path/to/.env")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connection pool / timeout tuning for the async client
+AOAI_MAX_CONNECTIONS = int(os.getenv("AOAI_MAX_CONNECTIONS_PART2", "100"))
+AOAI_MAX_KEEPALIVE = int(os.getenv("AOAI_MAX_KEEPALIVE_PART2", "50"))
+AOAI_TIMEOUT = float(os.getenv("AOAI_TIMEOUT_PART2", "60"))
+AOAI_MAX_RETRIES = int(os.getenv("AOAI_MAX_RETRIES_PART2", "2"))
+
+
+def _load_config() -> tuple:
+    """Read and validate the Azure OpenAI settings shared by both clients."""
+    endpoint = os.getenv("AOAI_ENDPOINT_PART2")
+    api_key = os.getenv("AOAI_KEY_PART2")
+    api_version = os.getenv("AOAI_API_VERSION_PART2", "2024-02-15-preview")
+
+    # Validate environment variables
+    if not endpoint:
+        raise ValueError("AOAI_ENDPOINT_PART2 is not set in environment variables")
+
+    if not api_key:
+        raise ValueError("AOAI_KEY_PART2 is not set in environment variables")
+
+    logger.debug(
+        "Azure OpenAI config | endpoint=%s | api_version=%s",
+        endpoint,
+        api_version
+    )
+    return endpoint, api_key, api_version
+
+
 def init_client() -> AzureOpenAI:
     """
     Initialize and return AzureOpenAI client using environment variables.
+    Used for the startup embedding pipeline.
     Raises RuntimeError if configuration is invalid.
     """
     try:
         # Read secrets from environment
-        endpoint = os.getenv("AOAI_ENDPOINT_PART2")
-        api_key = os.getenv("AOAI_KEY_PART2")
-        api_version = os.getenv("AOAI_API_VERSION_PART2", "2024-02-15-preview")
-
-        # Validate environment variables
-        if not endpoint:
-            raise ValueError("AOAI_ENDPOINT_PART2 is not set in environment variables")
-
-        if not api_key:
-            raise ValueError("AOAI_KEY_PART2 is not set in environment variables")
+        endpoint, api_key, api_version = _load_config()
 
         logger.info("Initializing Azure OpenAI client")
-        logger.debug(
-            "Azure OpenAI config | endpoint=%s | api_version=%s",
-            endpoint,
-            api_version
-        )
 
         # Initialize client
         client = AzureOpenAI(
@@ -48,3 +64,39 @@ def init_client() -> AzureOpenAI:
         logger.exception("Failed to initialize Azure OpenAI client")
         raise RuntimeError("Azure OpenAI client initialization failed") from e
 
+
+def init_async_client() -> AsyncAzureOpenAI:
+    """
+    Initialize and return an AsyncAzureOpenAI client for the request path.
+    It shares one pooled keep-alive HTTP transport, so a single worker can
+    keep many LLM calls in flight without blocking the event loop.
+    Raises RuntimeError if configuration is invalid.
+    """
+    try:
+        endpoint, api_key, api_version = _load_config()
+
+        logger.info(
+            "Initializing async Azure OpenAI client | max_connections=%d | max_keepalive=%d | timeout=%.0fs",
+            AOAI_MAX_CONNECTIONS, AOAI_MAX_KEEPALIVE, AOAI_TIMEOUT
+        )
+
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=AOAI_MAX_CONNECTIONS,
+                max_keepalive_connections=AOAI_MAX_KEEPALIVE,
+                keepalive_expiry=30
+            ),
+            timeout=httpx.Timeout(AOAI_TIMEOUT, connect=5.0)
+        )
+
+        return AsyncAzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            max_retries=AOAI_MAX_RETRIES,
+            http_client=http_client
+        )
+
+    except Exception as e:
+        logger.exception("Failed to initialize async Azure OpenAI client")
+        raise RuntimeError("Async Azure OpenAI client initialization failed") from e
@@ -39,6 +39,34 @@ def build_user_info_collect_prompt(user_info: dict, language: str = "english") -
         return fallback_prompt
 
 
+def build_field_resolution_prompt(unresolved: dict, allowed_values: dict) -> str:
+    """
+    Construct a small prompt asking the LLM to map only the user-info values the
+    local validator could not match (e.g. misspelled or transliterated HMO names)
+    onto their allowed options.
+    """
+    try:
+        options_text = ""
+        for field, value in unresolved.items():
+            options_text += f"- {field}: {value!r} -> one of {allowed_values[field]}\n"
+
+        prompt = (
+            "You are a helpful assistant. "
+            "Each line below contains a user-provided value that may be misspelled, transliterated "
+            "or written in another language, followed by the allowed options.\n"
+            "Map every value to the allowed option it clearly refers to. "
+            "If a value does not clearly match any option, use an empty string.\n"
+            "Return a strict JSON object mapping each field name to the chosen option.\n\n"
+            f"{options_text}"
+        )
+        logger.debug("Field resolution prompt built successfully | fields=%s", list(unresolved))
+        return prompt
+
+    except Exception as e:
+        logger.exception("Failed to build field resolution prompt")
+        return f"Map these values to their allowed options and return JSON: {unresolved} {allowed_values}"
+
+
 def build_q_and_a_prompt(
     question: str,
     context_texts: list,
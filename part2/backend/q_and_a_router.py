@@ -1,50 +1,126 @@
 from fastapi import APIRouter, Request, HTTPException
-from part2.backend.rag_engine import get_relevant_chunks
+from fastapi.responses import StreamingResponse
+from part2.backend.rag_engine import get_relevant_chunks, embed_question, lexical_shortcut
 from part2.backend.prompts import build_q_and_a_prompt
 import logging
+import json
 
 logger = logging.getLogger(__name__)
 q_and_a_router = APIRouter()
 
-@q_and_a_router.post("/ask")
-async def ask_question(payload: dict, request: Request):
-    try:
-        # Validate input
-        question = payload.get("question", "").strip()
-        user_info = payload.get("user_info", {})
-        conversation_history = payload.get("conversation_history", [])
-        language = payload.get("language", "english").lower()  # default to English
-
-        if not question:
-            logger.warning("Received empty question in payload: %s", payload)
-            raise HTTPException(status_code=400, detail="Question is required")
-        if "hmo_name" not in user_info or "insurance_tier" not in user_info:
-            logger.warning("User info incomplete in payload: %s", payload)
-            raise HTTPException(status_code=400, detail="User info incomplete")
-
-        logger.info(
-            "Processing question: %s | User HMO: %s | Tier: %s | Language: %s",
-            question, user_info["hmo_name"], user_info["insurance_tier"], language
+
+async def prepare_answer(payload: dict, request: Request) -> dict:
+    """
+    Shared first half of /ask and /ask/stream: validate the payload, embed the
+    question, consult the semantic answer cache and, on a miss, retrieve
+    context and build the LLM prompt.
+
+    Returns a context dict; `cached_answer` is set on a cache hit, otherwise `prompt`.
+    """
+    # Validate input
+    question = payload.get("question", "").strip()
+    user_info = payload.get("user_info", {})
+    conversation_history = payload.get("conversation_history", [])
+    language = payload.get("language", "english").lower()  # default to English
+
+    if not question:
+        logger.warning("Received empty question in payload: %s", payload)
+        raise HTTPException(status_code=400, detail="Question is required")
+    if "hmo_name" not in user_info or "insurance_tier" not in user_info:
+        logger.warning("User info incomplete in payload: %s", payload)
+        raise HTTPException(status_code=400, detail="User info incomplete")
+
+    logger.info(
+        "Processing question: %s | User HMO: %s | Tier: %s | Language: %s",
+        question, user_info["hmo_name"], user_info["insurance_tier"], language
+    )
+
+    client = request.app.state.async_client
+    lexical_texts = lexical_shortcut(question, user_info["hmo_name"], user_info["insurance_tier"], request)
+    if lexical_texts is None:
+        q_emb = await embed_question(question, client, cache=request.app.state.question_cache)
+    else:
+        # Exact service-name question: only an embedding that is already cached is used;
+        # the answer cache still matches repeats of the question text
+        q_emb = request.app.state.question_cache.peek(question)
+
+    ctx = {
+        "question": question,
+        "conversation_history": conversation_history,
+        "language": language,
+        "q_emb": q_emb,
+        "cache_key": (user_info["hmo_name"], user_info["insurance_tier"], language),
+        "kb_version": request.app.state.chunk_index.version,
+        "use_answer_cache": not conversation_history,
+        "cached_answer": None,
+        "prompt": None
+    }
+
+    # Serve near-duplicate first questions from the semantic answer cache
+    if ctx["use_answer_cache"]:
+        cached = request.app.state.answer_cache.get(
+            ctx["cache_key"], q_emb, kb_version=ctx["kb_version"], question=question
         )
+        if cached is not None:
+            answer, similarity = cached
+            logger.info("Answer served from semantic cache | similarity=%.3f", similarity)
+            ctx["cached_answer"] = answer
+            return ctx
 
-        # Retrieve relevant chunks
-        relevant_texts = get_relevant_chunks(
-            question, user_info["hmo_name"], user_info["insurance_tier"], request
+    # Retrieve relevant chunks
+    relevant_texts = lexical_texts
+    if relevant_texts is None:
+        relevant_texts = await get_relevant_chunks(
+            question, user_info["hmo_name"], user_info["insurance_tier"], request, q_emb=q_emb
         )
-        logger.debug("Retrieved %d relevant chunks", len(relevant_texts))
+    logger.debug("Retrieved %d relevant chunks", len(relevant_texts))
 
-        # Build prompt including language
-        prompt = build_q_and_a_prompt(
-            question, relevant_texts, conversation_history, language=language
+    # Build prompt including language
+    ctx["prompt"] = build_q_and_a_prompt(
+        question, relevant_texts, conversation_history, language=language
+    )
+    logger.debug("Prompt built successfully | length=%d", len(ctx["prompt"]))
+    return ctx
+
+
+def finish_answer(ctx: dict, answer: str, request: Request, cached: bool) -> dict:
+    """Store a fresh answer in the semantic cache and build the /ask response body."""
+    if ctx["use_answer_cache"] and not cached:
+        request.app.state.answer_cache.put(
+            ctx["cache_key"], ctx["question"], ctx["q_emb"], answer, kb_version=ctx["kb_version"]
         )
-        logger.debug("Prompt built successfully | length=%d", len(prompt))
+
+    # Update conversation history
+    conversation_history = ctx["conversation_history"]
+    conversation_history.append({"user": ctx["question"], "bot": answer})
+
+    return {
+        "answer": answer,
+        "conversation_history": conversation_history,
+        "language": ctx["language"],
+        "cached": cached
+    }
+
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@q_and_a_router.post("/ask")
+async def ask_question(payload: dict, request: Request):
+    try:
+        ctx = await prepare_answer(payload, request)
+        if ctx["cached_answer"] is not None:
+            return finish_answer(ctx, ctx["cached_answer"], request, cached=True)
 
         # Call LLM
         try:
-            client = request.app.state.azure_client
-            response = client.chat.completions.create(
+            client = request.app.state.async_client
+            response = await client.chat.completions.create(
                 model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
+                messages=[{"role": "user", "content": ctx["prompt"]}],
                 temperature=0.2
             )
             answer = response.choices[0].message.content.strip()
@@ -53,17 +129,66 @@ async def ask_question(payload: dict, request: Request):
             logger.exception("Failed to generate LLM answer")
             raise HTTPException(status_code=500, detail="LLM service error")
 
-        # Update conversation history
-        conversation_history.append({"user": question, "bot": answer})
-
-        return {
-            "answer": answer,
-            "conversation_history": conversation_history,
-            "language": language
-        }
+        return finish_answer(ctx, answer, request, cached=False)
 
     except HTTPException:
         raise
     except Exception as e:
         logger.exception("Unhandled error in /ask endpoint")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@q_and_a_router.post("/ask/stream")
+async def ask_question_stream(payload: dict, request: Request):
+    """
+    Streaming variant of /ask (Server-Sent Events).
+
+    Emits `data: {"token": ...}` events as the completion is generated, then a
+    final `event: done` whose data is the same body /ask returns. Failures after
+    the stream has started are reported as `event: error`.
+    """
+    try:
+        ctx = await prepare_answer(payload, request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in /ask/stream endpoint")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def event_stream():
+        if ctx["cached_answer"] is not None:
+            yield sse_event({"token": ctx["cached_answer"]})
+            yield sse_event(finish_answer(ctx, ctx["cached_answer"], request, cached=True), event="done")
+            return
+
+        parts = []
+        try:
+            client = request.app.state.async_client
+            stream = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": ctx["prompt"]}],
+                temperature=0.2,
+                stream=True
+            )
+            async for chunk in stream:
+                # Azure may send chunks without choices (e.g. content filter results)
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    parts.append(token)
+                    yield sse_event({"token": token})
+
+            answer = "".join(parts).strip()
+            logger.info("Generated streamed answer successfully | length=%d", len(answer))
+            yield sse_event(finish_answer(ctx, answer, request, cached=False), event="done")
+
+        except Exception:
+            logger.exception("Failed to stream LLM answer")
+            yield sse_event({"detail": "LLM service error"}, event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,100 @@
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE", "2048"))
+QUESTION_CACHE_TTL = float(os.getenv("QUESTION_CACHE_TTL", "0"))  # seconds, 0 disables expiry
+
+# Niqqud and cantillation marks only; maqaf, paseq and sof pasuq are punctuation
+_NIQQUD_RE = re.compile(r"[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")
+_MAQAF = "\u05BE"
+_PUNCT_RE = re.compile(r"[^\w\s]|_")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def strip_niqqud(text: str) -> str:
+    """Remove niqqud/cantillation marks and split maqaf-joined words ("בית־חולים" -> "בית חולים")."""
+    return _NIQQUD_RE.sub("", text).replace(_MAQAF, " ")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Canonical cache key for a question: niqqud/cantillation marks, punctuation
+    and repeated whitespace removed, case folded.
+    """
+    text = strip_niqqud(question)
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip().casefold()
+
+
+class QuestionEmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of question embeddings with optional TTL.
+    Keys are normalized question texts; hit/miss counters are kept for logging.
+    """
+
+    def __init__(self, max_size: int = QUESTION_CACHE_SIZE, ttl: float = QUESTION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, question: str):
+        """Return the cached embedding for `question` or None."""
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, embedding = entry
+                if self.ttl and time.monotonic() - stored_at > self.ttl:
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+
+            self.misses += 1
+            return None
+
+    def peek(self, question: str):
+        """Cached embedding for `question` or None, without touching recency or the hit/miss counters."""
+        with self._lock:
+            entry = self._entries.get(normalize_question(question))
+        if entry is None or (self.ttl and time.monotonic() - entry[0] > self.ttl):
+            return None
+        return entry[1]
+
+    def put(self, question: str, embedding):
+        if self.max_size <= 0:
+            return
+
+        key = normalize_question(question)
+        embedding.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
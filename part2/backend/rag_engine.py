@@ -1,66 +1,83 @@
 import logging
 import numpy as np
-from numpy.linalg import norm
 from fastapi import Request
 
-logger = logging.getLogger(__name__)
+from part2.backend.html_loader import EMBEDDING_MODEL
+from part2.backend.lexical_index import LEXICAL_SKIP_EMBEDDING
 
-def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-    """Compute cosine similarity between two vectors."""
-    try:
-        sim = np.dot(a, b) / (norm(a) * norm(b))
-        return sim
-    except Exception as e:
-        logger.exception("Failed to compute cosine similarity")
-        return 0.0
+logger = logging.getLogger(__name__)
 
-def embed_question(question: str, client) -> np.ndarray:
-    """Generate embedding for a single question using AzureOpenAI client."""
+async def embed_question(question: str, client, cache=None) -> np.ndarray:
+    """
+    Generate embedding for a single question using the AsyncAzureOpenAI client.
+    When a QuestionEmbeddingCache is given, repeated questions skip the API call.
+    """
     try:
         if not question.strip():
             logger.warning("Empty question received for embedding")
             return np.zeros(1536)  # default dimension for text-embedding-ada-002
 
-        resp = client.embeddings.create(model="text-embedding-ada-002", input=question)
-        embedding = np.array(resp.data[0].embedding)
+        if cache is not None:
+            cached = cache.get(question)
+            if cached is not None:
+                logger.debug("Question embedding served from cache | hit_rate=%.2f", cache.hit_rate)
+                return cached
+
+        resp = await client.embeddings.create(model=EMBEDDING_MODEL, input=question)
+        embedding = np.array(resp.data[0].embedding, dtype=np.float32)
         logger.debug("Question embedding generated successfully | shape=%s", embedding.shape)
+
+        if cache is not None:
+            cache.put(question, embedding)
         return embedding
     except Exception as e:
         logger.exception("Failed to generate embedding for question: %s", question)
         # Return zero vector to avoid crashing downstream
         return np.zeros(1536)
 
-def get_relevant_chunks(question: str, user_hmo: str, user_tier: str, request: Request, top_k=3):
+def lexical_shortcut(question: str, user_hmo: str, user_tier: str, request: Request, top_k=3):
     """
-    Filter all_chunks by user HMO/tier and get top_k most relevant chunks using embeddings.
+    Top_k chunks from the BM25 ranking alone when the question names a service of
+    the user's (HMO, tier) table, so no embedding call is needed; None otherwise.
+    """
+    chunk_index = request.app.state.chunk_index
+    if not LEXICAL_SKIP_EMBEDDING or not len(chunk_index):
+        return None
+
+    decisive, results = chunk_index.lexical_search(question, user_hmo, user_tier, top_k=top_k)
+    if not decisive:
+        return None
+    logger.info("Decisive lexical match, embedding skipped | HMO=%s | tier=%s", user_hmo, user_tier)
+    return [text for _, text in results]
+
+
+async def get_relevant_chunks(question: str, user_hmo: str, user_tier: str, request: Request, top_k=3, q_emb=None):
+    """
+    Get the top_k chunks most relevant to the question from the user's
+    (HMO, tier) partition plus the shared general partition, ranked by fused
+    cosine + BM25 scores. Without `q_emb`, a decisive lexical match is returned
+    as is; otherwise the question is embedded (pass `q_emb` to reuse one).
     """
     try:
-        client = request.app.state.azure_client
-        all_chunks = request.app.state.all_chunks
+        client = request.app.state.async_client
+        chunk_index = request.app.state.chunk_index
 
-        if not all_chunks:
+        if not len(chunk_index):
             logger.warning("No chunks available in memory")
             return []
 
-        q_emb = embed_question(question, client)
-
-        # Filter by HMO and tier
-        filtered = []
-        for chunk in all_chunks:
-            try:
-                if chunk["hmo"] == user_hmo and chunk["tier"] == user_tier:
-                    sim = cosine_similarity(q_emb, chunk["embedding"])
-                    filtered.append((sim, chunk))
-            except KeyError as e:
-                logger.warning("Chunk missing expected keys: %s", chunk)
+        if q_emb is None:
+            top_chunks = lexical_shortcut(question, user_hmo, user_tier, request, top_k=top_k)
+            if top_chunks is not None:
+                return top_chunks
+            q_emb = await embed_question(question, client, cache=request.app.state.question_cache)
 
-        if not filtered:
+        results = chunk_index.search(q_emb, user_hmo, user_tier, top_k=top_k, question=question)
+        if not results:
             logger.info("No relevant chunks found for HMO=%s, tier=%s", user_hmo, user_tier)
             return []
 
-        # Sort by similarity
-        filtered.sort(key=lambda x: x[0], reverse=True)
-        top_chunks = [c["text"] for _, c in filtered[:top_k]]
+        top_chunks = [text for _, text in results]
 
         logger.debug("Top %d chunks retrieved | HMO=%s | tier=%s", len(top_chunks), user_hmo, user_tier)
         return top_chunks
@@ -68,4 +85,3 @@ def get_relevant_chunks(question: str, user_hmo: str, user_tier: str, request: R
     except Exception as e:
         logger.exception("Failed to get relevant chunks for question: %s", question)
         return []
-
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Request, HTTPException
 import logging
 import json
 import re
-from part2.backend.prompts import build_user_info_collect_prompt
+from part2.backend.prompts import build_user_info_collect_prompt, build_field_resolution_prompt
+from part2.backend.user_info_validator import validate_user_info, apply_resolutions, ALLOWED_VALUES
 
 logger = logging.getLogger(__name__)
 user_info_collect_router = APIRouter()
@@ -40,10 +41,61 @@ def extract_final_json(llm_output: str):
         return None
 
 
+async def verify_with_llm(user_info: dict, language: str, client) -> dict:
+    """Full LLM validation, used when the input cannot be parsed locally."""
+    # Build LLM prompt
+    validation_prompt = build_user_info_collect_prompt(user_info, language)
+
+    # Call Azure OpenAI client (non-blocking)
+    response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": validation_prompt}],
+        temperature=0
+    )
+
+    llm_output = response.choices[0].message.content.strip()
+    logger.info("LLM output received")
+
+    # Extract and parse the final JSON
+    verification_result = extract_final_json(llm_output)
+
+    # Fallback if parsing failed
+    if not verification_result:
+        logger.warning("Could not extract valid JSON from LLM response. Returning raw output.")
+        verification_result = {
+            "all_correct": False,
+            "corrected_info": {},
+            "missing_fields": [],
+            "llm_output": llm_output
+        }
+
+    return verification_result
+
+
+async def resolve_fields_with_llm(unresolved: dict, client) -> dict:
+    """Ask the LLM to map only the locally unresolved values onto their allowed options."""
+    prompt = build_field_resolution_prompt(
+        unresolved, {field: ALLOWED_VALUES[field] for field in unresolved}
+    )
+    response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0
+    )
+    llm_output = response.choices[0].message.content.strip()
+    logger.info("LLM field resolution received | fields=%s", list(unresolved))
+    return extract_final_json(llm_output) or {}
+
+
 @user_info_collect_router.post("/verify_user_details")
 async def verify_user_details(payload: dict, request: Request):
     """
-    Endpoint to verify user details using LLM.
+    Endpoint to verify user details.
+
+    Mechanical rules (ID / card digits, age range, enumerated HMO, tier and
+    gender values) are checked locally. The LLM is called only for values
+    that cannot be resolved locally, or for the whole input when it cannot
+    be parsed at all.
 
     Expects payload:
     {
@@ -65,35 +117,23 @@ async def verify_user_details(payload: dict, request: Request):
         if not user_info:
             raise HTTPException(status_code=400, detail="User info missing")
 
-        # Build LLM prompt
-        validation_prompt = build_user_info_collect_prompt(user_info, language)
-
-        # Call Azure OpenAI client
-        client = request.app.state.azure_client
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": validation_prompt}],
-            temperature=0
-        )
-
-        llm_output = response.choices[0].message.content.strip()
-        logger.info("LLM output received")
+        client = request.app.state.async_client
 
-        # Extract and parse the final JSON
-        verification_result = extract_final_json(llm_output)
+        result = validate_user_info(user_info, language)
+        if result is None:
+            logger.info("Falling back to full LLM validation")
+            return await verify_with_llm(user_info, language, client)
 
-        # Fallback if parsing failed
-        if not verification_result:
-            logger.warning("Could not extract valid JSON from LLM response. Returning raw output.")
-            verification_result = {
-                "all_correct": False,
-                "corrected_info": {},
-                "missing_fields": [],
-                "llm_output": llm_output
-            }
+        if result["unresolved"]:
+            resolutions = await resolve_fields_with_llm(result["unresolved"], client)
+        else:
+            resolutions = {}
+            logger.info("User details validated locally without LLM")
 
-        return verification_result
+        return apply_resolutions(result, resolutions, language)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.exception("Failed to verify user details via LLM")
+        logger.exception("Failed to verify user details")
         raise HTTPException(status_code=500, detail="LLM validation error")
@@ -0,0 +1,205 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Field order of the newline-separated form sent by the frontend
+FIELD_ORDER = [
+    "first_name", "last_name", "id_number", "gender",
+    "age", "hmo_name", "hmo_card_number", "insurance_tier"
+]
+
+HMO_NAMES = ["מכבי", "מאוחדת", "כללית"]
+INSURANCE_TIERS = ["זהב", "כסף", "ארד"]
+
+# Options an LLM may map an unresolved value to
+ALLOWED_VALUES = {
+    "hmo_name": HMO_NAMES,
+    "insurance_tier": INSURANCE_TIERS,
+    "gender": ["male", "female"],
+}
+
+FIELD_LABELS = {
+    "first_name": ["first name", "first_name", "firstname", "שם פרטי"],
+    "last_name": ["last name", "last_name", "lastname", "surname", "family name", "שם משפחה"],
+    "id_number": ["id", "id number", "id_number", "תעודת זהות", "ת.ז", "ת\"ז", "תז", "מספר זהות"],
+    "gender": ["gender", "sex", "מין", "מגדר"],
+    "age": ["age", "גיל"],
+    "hmo_name": ["hmo", "hmo name", "hmo_name", "health fund", "קופת חולים", "קופה", "שם קופה"],
+    "hmo_card_number": [
+        "hmo card number", "hmo_card_number", "card number", "hmo card",
+        "מספר כרטיס", "מספר כרטיס קופה", "מספר כרטיס קופת חולים", "כרטיס קופה"
+    ],
+    "insurance_tier": [
+        "insurance tier", "insurance_tier", "tier", "membership tier",
+        "מסלול", "מסלול ביטוח", "רמת ביטוח", "דרגת ביטוח"
+    ],
+}
+_LABEL_TO_FIELD = {label: field for field, labels in FIELD_LABELS.items() for label in labels}
+
+HMO_ALIASES = {
+    "מכבי": "מכבי", "maccabi": "מכבי", "מכבי שירותי בריאות": "מכבי",
+    "מאוחדת": "מאוחדת", "meuhedet": "מאוחדת",
+    "כללית": "כללית", "clalit": "כללית", "שירותי בריאות כללית": "כללית",
+}
+TIER_ALIASES = {
+    "זהב": "זהב", "gold": "זהב",
+    "כסף": "כסף", "silver": "כסף",
+    "ארד": "ארד", "bronze": "ארד",
+}
+GENDER_ALIASES = {
+    "male": "male", "m": "male", "man": "male", "זכר": "male", "ז": "male", "גבר": "male",
+    "female": "female", "f": "female", "woman": "female", "נקבה": "female", "נ": "female", "אישה": "female",
+}
+GENDER_OUTPUT = {
+    "english": {"male": "Male", "female": "Female"},
+    "hebrew": {"male": "זכר", "female": "נקבה"},
+}
+
+_NAME_RE = re.compile(r"^[A-Za-zא-ת]+(?:[ '\-][A-Za-zא-ת]+)*$")
+_DIGITS_RE = re.compile(r"^\d{9}$")
+_SEPARATORS_RE = re.compile(r"[\s\-]")
+
+
+def _clean_key(text: str) -> str:
+    return " ".join(text.strip().lower().split())
+
+
+def parse_user_text(raw_text: str):
+    """
+    Parse the user details form into a {field: value} dict.
+
+    Supports "label: value" lines (Hebrew or English labels) and the plain
+    8-line positional layout. Returns None when the text matches neither.
+    """
+    lines = [line.strip() for line in raw_text.splitlines() if line.strip()]
+    if not lines:
+        return None
+
+    labelled = {}
+    for line in lines:
+        label, sep, value = line.partition(":")
+        field = _LABEL_TO_FIELD.get(_clean_key(label)) if sep else None
+        if field is None or field in labelled:
+            labelled = None
+            break
+        labelled[field] = value.strip()
+
+    if labelled:
+        return labelled
+
+    if len(lines) == len(FIELD_ORDER):
+        return dict(zip(FIELD_ORDER, lines))
+
+    return None
+
+
+def _resolve_alias(value: str, aliases: dict):
+    key = _clean_key(value)
+    if key.startswith("קופת חולים "):
+        key = key[len("קופת חולים "):]
+    return aliases.get(key)
+
+
+def validate_user_info(user_info: dict, language: str = "english"):
+    """
+    Mechanically validate user details.
+
+    Returns None when the input cannot be parsed (caller should fall back to
+    the LLM), otherwise a dict with:
+      all_correct, corrected_info, missing_fields - same contract as the LLM path
+      unresolved - {field: raw value} for enumerated fields whose value could
+                   not be matched locally (e.g. misspelled HMO names)
+    """
+    language = language.lower() if language.lower() in GENDER_OUTPUT else "english"
+
+    if "raw_text" in user_info:
+        fields = parse_user_text(str(user_info.get("raw_text") or ""))
+        if fields is None:
+            logger.info("User details could not be parsed locally")
+            return None
+    else:
+        fields = {k: str(v).strip() for k, v in user_info.items() if k in FIELD_ORDER and v is not None}
+
+    corrected = {}
+    missing = []
+    unresolved = {}
+
+    for field in FIELD_ORDER:
+        value = fields.get(field, "").strip()
+        if not value:
+            missing.append(field)
+            continue
+
+        if field in ("first_name", "last_name"):
+            if _NAME_RE.match(value):
+                corrected[field] = value
+            else:
+                missing.append(field)
+
+        elif field in ("id_number", "hmo_card_number"):
+            digits = _SEPARATORS_RE.sub("", value)
+            if _DIGITS_RE.match(digits):
+                corrected[field] = digits
+            else:
+                missing.append(field)
+
+        elif field == "age":
+            if value.isdigit() and 0 <= int(value) <= 120:
+                corrected[field] = int(value)
+            else:
+                missing.append(field)
+
+        elif field == "gender":
+            gender = _resolve_alias(value, GENDER_ALIASES)
+            if gender:
+                corrected[field] = GENDER_OUTPUT[language][gender]
+            else:
+                unresolved[field] = value
+
+        elif field == "hmo_name":
+            hmo = _resolve_alias(value, HMO_ALIASES)
+            if hmo:
+                corrected[field] = hmo
+            else:
+                unresolved[field] = value
+
+        elif field == "insurance_tier":
+            tier = _resolve_alias(value, TIER_ALIASES)
+            if tier:
+                corrected[field] = tier
+            else:
+                unresolved[field] = value
+
+    logger.info(
+        "Local user info validation | valid=%d | missing=%s | unresolved=%s",
+        len(corrected), missing, list(unresolved)
+    )
+
+    return {
+        "all_correct": not missing and not unresolved,
+        "corrected_info": corrected,
+        "missing_fields": missing,
+        "unresolved": unresolved,
+    }
+
+
+def apply_resolutions(result: dict, resolutions: dict, language: str = "english") -> dict:
+    """
+    Merge LLM-resolved values for the unresolved fields into a local
+    validation result. Values outside the allowed options count as missing.
+    """
+    language = language.lower() if language.lower() in GENDER_OUTPUT else "english"
+    resolutions = resolutions or {}
+
+    for field in result.pop("unresolved", {}):
+        value = str(resolutions.get(field) or "").strip()
+        if field == "gender" and value.lower() in GENDER_OUTPUT[language]:
+            result["corrected_info"][field] = GENDER_OUTPUT[language][value.lower()]
+        elif field != "gender" and value in ALLOWED_VALUES[field]:
+            result["corrected_info"][field] = value
+        else:
+            result["missing_fields"].append(field)
+
+    result["all_correct"] = not result["missing_fields"]
+    return result
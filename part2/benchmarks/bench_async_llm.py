@@ -0,0 +1,96 @@
+"""
+Concurrency benchmark: blocking vs async Azure OpenAI calls inside async handlers.
+
+Each simulated /ask request does one embeddings call and one chat completion
+against the local stub server, exactly like the request path in q_and_a_router.
+The "blocking" mode reproduces the old handlers (sync AzureOpenAI client called
+from `async def`), the "async" mode uses the pooled AsyncAzureOpenAI client.
+
+Run from the project root:
+    python -m part2.benchmarks.bench_async_llm --requests 100 --concurrency 50 --latency 0.3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from part2.benchmarks.stub_openai_server import StubServer, create_stub_app
+
+
+async def blocking_request(client, question: str):
+    client.embeddings.create(model="text-embedding-ada-002", input=question)
+    client.chat.completions.create(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": question}],
+        temperature=0.2
+    )
+
+
+async def async_request(client, question: str):
+    await client.embeddings.create(model="text-embedding-ada-002", input=question)
+    await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": question}],
+        temperature=0.2
+    )
+
+
+async def run_load(handler, client, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await handler(client, f"question {i}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "wall_s": wall,
+        "throughput_rps": total / wall,
+        "p50_s": statistics.median(latencies),
+        "p95_s": latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub latency per LLM call (seconds)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with StubServer(create_stub_app(latency=args.latency), port=args.port) as stub:
+        os.environ["AOAI_ENDPOINT_PART2"] = stub.url
+        os.environ["AOAI_KEY_PART2"] = "stub-key"
+
+        from part2.backend.openai_client import init_client, init_async_client
+
+        sync_client = init_client()
+        blocking = asyncio.run(run_load(blocking_request, sync_client, args.requests, args.concurrency))
+
+        async def run_async():
+            client = init_async_client()
+            try:
+                return await run_load(async_request, client, args.requests, args.concurrency)
+            finally:
+                await client.close()
+
+        non_blocking = asyncio.run(run_async())
+
+    print(f"requests={args.requests} concurrency={args.concurrency} stub_latency={args.latency}s")
+    print(f"{'mode':<10}{'wall_s':>10}{'req/s':>10}{'p50_s':>10}{'p95_s':>10}")
+    for name, r in (("blocking", blocking), ("async", non_blocking)):
+        print(f"{name:<10}{r['wall_s']:>10.2f}{r['throughput_rps']:>10.1f}{r['p50_s']:>10.2f}{r['p95_s']:>10.2f}")
+    print(f"speedup: {non_blocking['throughput_rps'] / blocking['throughput_rps']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Local stand-in for the Azure OpenAI endpoints used by the Part 2 backend.
+
+Serves chat completions and embeddings with a configurable artificial latency,
+so client behaviour can be benchmarked without hitting Azure.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+EMBEDDING_DIM = 1536
+
+
+def _fake_embedding(text: str) -> list:
+    """Deterministic pseudo-embedding so repeated texts map to the same vector."""
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    return [((seed[i % len(seed)] + i) % 251) / 251.0 - 0.5 for i in range(EMBEDDING_DIM)]
+
+
+def create_stub_app(latency: float = 0.5) -> FastAPI:
+    app = FastAPI(title="Azure OpenAI stub")
+    app.state.latency = latency
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        if body.get("stream"):
+            return StreamingResponse(_stream_chunks(deployment), media_type="text/event-stream")
+
+        await asyncio.sleep(app.state.latency)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "stub answer"}
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110}
+        }
+
+    async def _stream_chunks(deployment: str):
+        # First token after the full latency, the rest spread over the same interval again
+        tokens = ["stub ", "streamed ", "answer"]
+        await asyncio.sleep(app.state.latency)
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(app.state.latency / len(tokens))
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": deployment,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/deployments/{deployment}/embeddings")
+    async def embeddings(deployment: str, request: Request):
+        body = await request.json()
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await asyncio.sleep(app.state.latency)
+        return {
+            "object": "list",
+            "model": deployment,
+            "data": [
+                {"object": "embedding", "index": i, "embedding": _fake_embedding(t)}
+                for i, t in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)}
+        }
+
+    return app
+
+
+class StubServer:
+    """Run the stub app with uvicorn in a background thread."""
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 8765):
+        self.url = f"http://{host}:{port}"
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
@@ -1,6 +1,7 @@
 import os
 import shutil
 import time
+import json
 import streamlit as st
 import requests
 from logging_config import setup_logging
@@ -10,7 +11,9 @@ import logging
 # Configuration
 # ==============================
 VERIFY_URL = "http://localhost:8000/verify_user_details"
-ASK_URL = "http://localhost:8000/ask"
+ASK_STREAM_URL = "http://localhost:8000/ask/stream"
+# (connect, read) timeouts - the read timeout applies between streamed events, not to the whole answer
+ASK_STREAM_TIMEOUT = (5, 60)
 LOGS_DIR = "logs_part2"  # same as in logging_config
 
 
@@ -91,10 +94,22 @@ def verify_user_details(raw_text: str, language: str, logger):
     return response.json()
 
 
-def ask_question(payload: dict):
-    response = requests.post(ASK_URL, json=payload, timeout=20)
-    response.raise_for_status()
-    return response.json()
+def ask_question_stream(payload: dict):
+    """
+    Call the streaming /ask endpoint and yield parsed Server-Sent Events
+    as (event, data) tuples: ("token", {...}), ("done", {...}) or ("error", {...}).
+    """
+    with requests.post(ASK_STREAM_URL, json=payload, stream=True, timeout=ASK_STREAM_TIMEOUT) as response:
+        response.raise_for_status()
+        event = "token"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                event = "token"
+                continue
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):].strip())
 
 
 # ==============================
@@ -157,6 +172,15 @@ def render_user_info_collection(logger):
 
 
 
+def render_bot_message(bot_text: str, target=None):
+    """Render a bot message, optionally into an st.empty() placeholder that is updated in place."""
+    target = target or st.empty()
+    if st.session_state.language == "hebrew":
+        target.markdown(f"<div dir='rtl'><b>Bot:</b> {bot_text}</div>", unsafe_allow_html=True)
+    else:
+        target.markdown(f"**Bot:** {bot_text}")
+
+
 def render_chat_ui(logger):
     question = st.text_input("Ask a question / שאל שאלה")
     if st.button("Send / שלח"):
@@ -171,19 +195,41 @@ def render_chat_ui(logger):
             "language": st.session_state.language
         }
 
+        # Previous turns are shown right away, the new answer is filled in as tokens arrive
+        for turn in st.session_state.conversation_history:
+            st.markdown(f"**User:** {turn['user']}")
+            render_bot_message(turn["bot"])
+        st.markdown(f"**User:** {question}")
+        placeholder = st.empty()
+
         try:
-            data = ask_question(payload)
-            answer = data.get("answer", "")
+            start = time.perf_counter()
+            first_token_at = None
+            answer = ""
+            done = None
+
+            for event, data in ask_question_stream(payload):
+                if event == "token":
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter() - start
+                    answer += data.get("token", "")
+                    render_bot_message(answer + " ▌", placeholder)
+                elif event == "done":
+                    done = data
+                elif event == "error":
+                    raise RuntimeError(data.get("detail", "Streaming error"))
+
+            if done is not None:
+                answer = done.get("answer", answer)
+            render_bot_message(answer, placeholder)
             st.session_state.conversation_history.append({"user": question, "bot": answer})
 
-            for turn in st.session_state.conversation_history:
-                st.markdown(f"**User:** {turn['user']}")
-                if st.session_state.language == "hebrew":
-                    st.markdown(f"<div dir='rtl'><b>Bot:</b> {turn['bot']}</div>", unsafe_allow_html=True)
-                else:
-                    st.markdown(f"**Bot:** {turn['bot']}")
-
-            logger.info("Question answered successfully")
+            logger.info(
+                "Question answered successfully (cached=%s, ttft=%.2fs, total=%.2fs)",
+                (done or {}).get("cached", False),
+                first_token_at if first_token_at is not None else -1.0,
+                time.perf_counter() - start
+            )
 
         except Exception as e:
             st.error("Failed to get answer from server")